@@ -1,14 +1,25 @@
 from django.urls import path
 from users.views import CsrfView, LoginView, LogoutView, MeView, RegisterView, TokenRefreshCookieView
 from core.views import HealthView, ReadinessView
-from groups.views import GroupApproveView, GroupCreateView, GroupJoinView, GroupMembersView
+from feed.views import HomeFeedView
+from groups.views import (
+    GroupApproveView,
+    GroupJoinView,
+    GroupListCreateView,
+    GroupMembersView,
+    GroupPendingMembersView,
+    GroupReviewView,
+)
 from posts.views import (
     CommentDetailView,
     CommentListCreateView,
+    CommentRepliesView,
+    CommentThreadListView,
     GroupPostsView,
     PostDetailView,
     PostListCreateView,
     ReportCreateView,
+    TrendingPostsView,
     UserPostsView,
 )
 from notifications.views import (
@@ -16,6 +27,7 @@ from notifications.views import (
     NotificationReadAllView,
     NotificationReadView,
     NotificationUnreadCountView,
+    notification_stream,
 )
 from profiles.views import MeProfileView
 from social.views import BlockView, FollowView
@@ -32,18 +44,35 @@ urlpatterns = [
     path("profiles/me/", MeProfileView.as_view(), name="profiles_me"),
     path("users/<int:user_id>/follow/", FollowView.as_view(), name="user_follow"),
     path("users/<int:user_id>/block/", BlockView.as_view(), name="user_block"),
-    path("groups/", GroupCreateView.as_view(), name="group_create"),
+    path("groups/", GroupListCreateView.as_view(), name="group_list_create"),
     path("groups/<int:group_id>/join/", GroupJoinView.as_view(), name="group_join"),
     path("groups/<int:group_id>/members/", GroupMembersView.as_view(), name="group_members"),
+    path(
+        "groups/<int:group_id>/members/pending/",
+        GroupPendingMembersView.as_view(),
+        name="group_members_pending",
+    ),
+    path(
+        "groups/<int:group_id>/members/review/",
+        GroupReviewView.as_view(),
+        name="group_members_review",
+    ),
     path(
         "groups/<int:group_id>/members/<int:user_id>/approve/",
         GroupApproveView.as_view(),
         name="group_member_approve",
     ),
     path("posts/", PostListCreateView.as_view(), name="post_list_create"),
+    path("posts/trending/", TrendingPostsView.as_view(), name="post_trending"),
     path("posts/<int:post_id>/", PostDetailView.as_view(), name="post_detail"),
     path("posts/<int:post_id>/comments/", CommentListCreateView.as_view(), name="comment_list"),
+    path(
+        "posts/<int:post_id>/comments/threads/",
+        CommentThreadListView.as_view(),
+        name="comment_threads",
+    ),
     path("comments/<int:pk>/", CommentDetailView.as_view(), name="comment_detail"),
+    path("comments/<int:pk>/replies/", CommentRepliesView.as_view(), name="comment_replies"),
     path("reports/", ReportCreateView.as_view(), name="report_create"),
     path("notifications/", NotificationListView.as_view(), name="notifications_list"),
     path(
@@ -61,6 +90,8 @@ urlpatterns = [
         NotificationUnreadCountView.as_view(),
         name="notifications_unread_count",
     ),
+    path("notifications/stream/", notification_stream, name="notifications_stream"),
     path("groups/<int:group_id>/posts/", GroupPostsView.as_view(), name="group_posts"),
     path("users/<int:user_id>/posts/", UserPostsView.as_view(), name="user_posts"),
+    path("feed/home/", HomeFeedView.as_view(), name="feed_home"),
 ]
@@ -45,11 +45,13 @@ INSTALLED_APPS = [
     "groups",
     "posts",
     "notifications",
+    "feed",
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -100,6 +102,21 @@ else:
         }
     }
 
+# Read replicas: comma-separated hosts (Postgres) or database files (SQLite). Safe-method
+# requests read from them unless the client wrote within DB_REPLICA_PIN_SECONDS (replica lag
+# budget), see core.db. Tests mirror every replica onto the primary.
+DATABASE_REPLICAS = []
+for index, location in enumerate(
+    [r.strip() for r in get_env("DJANGO_DB_REPLICAS", "").split(",") if r.strip()], start=1
+):
+    alias = f"replica{index}"
+    replica = dict(DATABASES["default"], TEST={"MIRROR": "default"})
+    replica["NAME" if DB_ENGINE == "django.db.backends.sqlite3" else "HOST"] = location
+    DATABASES[alias] = replica
+    DATABASE_REPLICAS.append(alias)
+DB_REPLICA_PIN_SECONDS = int(get_env("DJANGO_DB_REPLICA_PIN_SECONDS", "5"))
+DATABASE_ROUTERS = ["core.db.PrimaryReplicaRouter"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -147,8 +164,59 @@ else:
         }
     }
 
+# Home feed: authors with at least this many followers are merged at read time
+# instead of being fanned out to every follower's timeline on write.
+FEED_FANOUT_FOLLOWER_THRESHOLD = int(get_env("FEED_FANOUT_FOLLOWER_THRESHOLD", "10000"))
+FEED_RECENT_POSTS_PER_AUTHOR = int(get_env("FEED_RECENT_POSTS_PER_AUTHOR", "100"))
+
+# Trending posts: engagement weight halves every TRENDING_HALF_LIFE_HOURS.
+TRENDING_HALF_LIFE_HOURS = float(get_env("TRENDING_HALF_LIFE_HOURS", "6"))
+
+# Viewers with more blocks than this are filtered while paginating instead of with NOT IN.
+BLOCKS_SQL_EXCLUDE_LIMIT = int(get_env("BLOCKS_SQL_EXCLUDE_LIMIT", "500"))
+
+# Anonymous post list pages are cached until a write bumps their scope version.
+ANONYMOUS_RESPONSE_CACHE_TIMEOUT = int(get_env("ANONYMOUS_RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Write notifications to an outbox table in the request's transaction and deliver them with
+# `manage.py drain_notifications --follow` instead of inserting them on the request path.
+NOTIFICATIONS_OUTBOX = get_env("NOTIFICATIONS_OUTBOX", "0") == "1"
+
+# Comment, reply and follow notifications for the same target collapse into one row per
+# window of this many seconds; 0 stores one row per notification.
+NOTIFICATION_AGGREGATION_WINDOW_SECONDS = int(
+    get_env("NOTIFICATION_AGGREGATION_WINDOW_SECONDS", "3600")
+)
+
+# Per-user unread badge counters live in the cache and are rebuilt from the DB after this long.
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = int(get_env("NOTIFICATION_UNREAD_CACHE_TIMEOUT", "600"))
+
+# Retention (`manage.py prune_retention`): notifications expire after their verb's TTL in days,
+# soft-deleted posts and comments are hard-deleted SOFT_DELETE_PURGE_DAYS after deletion.
+NOTIFICATION_RETENTION_DAYS = {
+    "default": int(get_env("NOTIFICATION_RETENTION_DAYS", "90")),
+    "followed": 30,
+    "group_approved": 30,
+}
+SOFT_DELETE_PURGE_DAYS = int(get_env("SOFT_DELETE_PURGE_DAYS", "30"))
+
+# Live notification streams (SSE, served by config.asgi) send a keepalive comment this often.
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = int(
+    get_env("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", "20")
+)
+
 # DRF
 REST_FRAMEWORK = {
+    # orjson-backed JSON; both fall back to DRF's stdlib implementation without orjson.
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "users.authentication.CookieJWTAuthentication",
     ),
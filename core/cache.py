@@ -0,0 +1,80 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from core.db import replica_reads
+
+VERSION_KEY = "version:{name}"
+RESPONSE_KEY = "response:{view}:{media_type}:{versions}:{digest}"
+
+
+def get_version(name):
+    """Return the current version token for ``name``, creating one if it is missing.
+
+    Cache entries that embed this token in their key are invalidated by ``bump_version``
+    without having to find or delete the entries themselves.
+    """
+    key = VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(*names):
+    """Invalidate everything keyed on the given version names (one cache write for all)."""
+    cache.delete_many([VERSION_KEY.format(name=name) for name in names])
+
+
+class AnonymousResponseCacheMixin:
+    """Serve rendered list responses to anonymous users from the cache.
+
+    The key covers the view, the query string, the negotiated media type and the current
+    version of every scope in ``get_cache_scopes()``; writers bump those versions, so a stale
+    page is never served after a write and nothing has to be deleted.
+    """
+
+    cache_timeout = None
+
+    def get_cache_scopes(self):
+        return []
+
+    def get_response_cache_key(self, request):
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        versions = ":".join(str(get_version(scope)) for scope in self.get_cache_scopes())
+        digest = hashlib.md5(
+            f"{request.path}?{params}".encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        return RESPONSE_KEY.format(
+            view=type(self).__name__,
+            media_type=request.accepted_media_type,
+            versions=versions,
+            digest=digest,
+        )
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        with replica_reads(False):
+            response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout
+            if timeout is None:
+                timeout = settings.ANONYMOUS_RESPONSE_CACHE_TIMEOUT
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, (rendered.content, rendered["Content-Type"]), timeout
+                )
+            )
+        return response
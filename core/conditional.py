@@ -0,0 +1,34 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(request, *state):
+    """Build a strong ETag from the request URL, negotiated media type and ``state``.
+
+    ``state`` should be a handful of cheap aggregates (max timestamps, max ids, row counts)
+    that change whenever the rendered body would.
+    """
+    accepted = getattr(request, "accepted_media_type", "")
+    payload = repr((request.get_full_path(), accepted, state)).encode("utf-8")
+    return f'"{hashlib.sha1(payload, usedforsecurity=False).hexdigest()}"'
+
+
+def conditional_response(request, render, state, last_modified=None):
+    """Answer ``If-None-Match``/``If-Modified-Since`` with a 304 before calling ``render``.
+
+    ``render`` builds the full response only when the client's copy is stale; validators are
+    attached to both the 304 and the full response.
+    """
+    etag = make_etag(request, *state)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    return response
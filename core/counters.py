@@ -0,0 +1,42 @@
+import time
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field, **filters):
+    """Correlated ``COUNT(*)`` of ``model`` rows whose ``field`` points at the outer row."""
+    rows = (
+        model.objects.filter(**{field: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def repair_counter(model, field, expected, batch_size=1000, sleep=0.0):
+    """Set ``field`` to ``expected()`` wherever it differs, in primary-key batches.
+
+    ``expected`` is a callable returning a fresh expression per batch. Works with historical
+    models too, so data migrations can backfill counters with it. Returns the rows changed.
+    """
+    repaired = 0
+    last_pk = 0
+    while True:
+        ids = list(
+            model.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return repaired
+        last_pk = ids[-1]
+        repaired += (
+            model.objects.filter(pk__in=ids)
+            .exclude(**{field: expected()})
+            .update(**{field: expected()})
+        )
+        if sleep:
+            time.sleep(sleep)
@@ -0,0 +1,50 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# True while the current request may read from a replica; set by ReplicaRoutingMiddleware.
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Allow (or forbid) replica reads for the duration of the block.
+
+    Code that fills a shared cache entry wraps its queries in ``replica_reads(False)``: the pin
+    cookie only covers the client that wrote, and a lagging replica's answer stored under a
+    freshly bumped version key would outlive the replication lag by the whole cache timeout.
+    """
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to a random ``DATABASE_REPLICAS`` alias when the context allows it.
+
+    Writes, migrations and reads inside a transaction on the primary always use the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or not _replica_reads.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
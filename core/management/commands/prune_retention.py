@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.retention import (
+    RETENTION_BATCH_SIZE,
+    prune_notifications,
+    purge_deleted_comments,
+    purge_deleted_posts,
+)
+
+TASKS = (
+    ("notifications", prune_notifications),
+    ("deleted comments", purge_deleted_comments),
+    ("deleted posts", purge_deleted_posts),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete notifications past their per-verb TTL and hard-purge soft-deleted posts and "
+        "comments past SOFT_DELETE_PURGE_DAYS, in small primary-key batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+        parser.add_argument(
+            "--sleep", type=float, default=0.1, help="Seconds to pause between batches."
+        )
+
+    def handle(self, *args, batch_size, sleep, **options):
+        for name, task in TASKS:
+            started = time.monotonic()
+            deleted = task(batch_size=batch_size, sleep=sleep)
+            self.stdout.write(
+                f"{name}: deleted {deleted} rows in {time.monotonic() - started:.2f}s"
+            )
@@ -0,0 +1,37 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.counters import count_of, repair_counter
+from groups.models import Group, Membership
+from posts.models import Comment, Post
+from social.models import Follow
+
+User = get_user_model()
+
+COUNTERS = (
+    (Post, "comment_count", lambda: count_of(Comment, "post", is_deleted=False)),
+    (Group, "member_count", lambda: count_of(Membership, "group", status=Membership.Status.ACTIVE)),
+    (User, "follower_count", lambda: count_of(Follow, "following")),
+    (User, "following_count", lambda: count_of(Follow, "follower")),
+)
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized counters and repair any that drifted, in primary-key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep", type=float, default=0.0, help="Seconds to pause between batches."
+        )
+
+    def handle(self, *args, batch_size, sleep, **options):
+        for model, field, expected in COUNTERS:
+            started = time.monotonic()
+            repaired = repair_counter(model, field, expected, batch_size=batch_size, sleep=sleep)
+            self.stdout.write(
+                f"{model._meta.label}.{field}: repaired {repaired} rows "
+                f"in {time.monotonic() - started:.2f}s"
+            )
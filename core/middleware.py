@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+
+from core.db import replica_reads
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+PIN_COOKIE_NAME = "db_pin"
+
+
+class ReplicaRoutingMiddleware:
+    """Route safe-method requests to replicas, except for clients that just wrote.
+
+    A successful unsafe request sets a short-lived cookie holding the time until which the
+    client stays on the primary, so it reads its own writes while replicas catch up.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replica = request.method in SAFE_METHODS and not self._pinned(request)
+        with replica_reads(use_replica):
+            response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_seconds = settings.DB_REPLICA_PIN_SECONDS
+            if settings.DATABASE_REPLICAS and pin_seconds > 0:
+                response.set_cookie(
+                    PIN_COOKIE_NAME,
+                    str(int(time.time()) + pin_seconds),
+                    max_age=pin_seconds,
+                    httponly=True,
+                    samesite="Lax",
+                    secure=request.is_secure(),
+                )
+        return response
+
+    @staticmethod
+    def _pinned(request):
+        try:
+            return int(request.COOKIES.get(PIN_COOKIE_NAME, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,171 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def positive_int(value, cutoff=None):
+    """Parse a strictly positive integer query parameter, capped at ``cutoff``."""
+    number = int(value)
+    if number <= 0:
+        raise ValueError(value)
+    return min(number, cutoff) if cutoff else number
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a unique ``ordering`` such as ``("-created_at", "-id")``.
+
+    The cursor carries the ordering values of the last (or first) row of the current page, and
+    the next page is a single range query on those values, so there is no ``COUNT(*)`` and no
+    ``OFFSET``. The last ordering field must be unique and all of them non-null. Rows may be
+    model instances or ``.values()`` dicts.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+    max_filter_rounds = 5
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.reverse, position = self.decode_cursor(request)
+
+        rows, has_more = self._fetch(queryset, position, getattr(view, "row_filter", None))
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def _fetch(self, queryset, position, row_filter=None):
+        """Return ``(rows, has_more)`` for one page in scan order.
+
+        ``row_filter`` drops rows after the query (e.g. authors hidden from the viewer). The
+        scan then continues past the last fetched row, for at most ``max_filter_rounds``
+        queries; if it stops early the far cursor points at the last row scanned, so the next
+        page resumes there instead of rescanning the dropped rows.
+        """
+        ordering = self._reversed_ordering() if self.reverse else self.ordering
+        limit = self.page_size + 1
+        rows = []
+        self.scan_position = None
+        for _ in range(self.max_filter_rounds if row_filter else 1):
+            batch_queryset = queryset
+            if position is not None:
+                batch_queryset = queryset.filter(self.position_filter(position, self.reverse))
+            batch = list(batch_queryset.order_by(*ordering)[:limit])
+            rows.extend(filter(row_filter, batch) if row_filter else batch)
+            if len(rows) >= limit or len(batch) < limit:
+                return rows[: self.page_size], len(rows) > self.page_size
+            position = self.position_of(batch[-1])
+        self.scan_position = position
+        return rows, True
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return positive_int(
+                request.query_params[self.page_size_query_param], cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.scan_position is not None and not self.reverse:
+            return self.encode_cursor(self.scan_position)
+        if not self.page:
+            return None
+        return self.encode_cursor(self.position_of(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.scan_position is not None and self.reverse:
+            return self.encode_cursor(self.scan_position, reverse=True)
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.position_of(self.page[0]), reverse=True)
+
+    def position_of(self, row):
+        fields = [self._field(name) for name in self._field_names()]
+        if isinstance(row, dict):
+            return [row[f.name] if f.name in row else row[f.attname] for f in fields]
+        return [getattr(row, f.attname) for f in fields]
+
+    def position_filter(self, position, reverse=False):
+        """Build ``(a, b, ...) > (x, y, ...)`` (per-field direction) as an OR of ANDs."""
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith("-")
+            field = name.lstrip("-")
+            lookup = "lt" if descending != reverse else "gt"
+            branch = Q(**{f"{field}__{lookup}": position[index]})
+            for prev_name, prev_value in zip(self.ordering[:index], position[:index]):
+                branch &= Q(**{prev_name.lstrip("-"): prev_value})
+            condition |= branch
+        return condition
+
+    def encode_cursor(self, position, reverse=False):
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in position]
+        payload = json.dumps([int(reverse), values], separators=(",", ":")).encode("utf-8")
+        token = urlsafe_b64encode(payload).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """Return ``(reverse, position)``; position is ``None`` on the first page."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return False, None
+        try:
+            reverse, values = json.loads(urlsafe_b64decode(token.encode("ascii")))
+            names = self._field_names()
+            if len(values) != len(names):
+                raise ValueError(token)
+            position = [self._field(name).to_python(value) for name, value in zip(names, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), position
+
+    def _field_names(self):
+        return [name.lstrip("-") for name in self.ordering]
+
+    def _field(self, name):
+        return self.model._meta.get_field(name)
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering]
@@ -0,0 +1,94 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from feed.models import TimelineEntry
+from notifications.cache import invalidate_unread
+from notifications.models import Notification
+from posts.models import Comment, Post
+
+RETENTION_BATCH_SIZE = 500
+
+
+def pk_batches(queryset, batch_size=RETENTION_BATCH_SIZE, sleep=0.0, descending=False):
+    """Yield lists of up to ``batch_size`` primary keys of ``queryset``, in key order.
+
+    The caller deletes each batch before the next one is fetched: the query is re-run past the
+    last key seen, so every ``DELETE`` is a small ``pk IN (...)`` that holds its locks briefly,
+    and rows that become eligible meanwhile (e.g. a parent whose last reply was just removed,
+    scanning ``descending``) are still reached. ``sleep`` seconds between batches leave room
+    for foreground traffic.
+    """
+    order, past = ("-pk", "pk__lt") if descending else ("pk", "pk__gt")
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(**{past: last_pk})
+        ids = list(batch.order_by(order).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+        if sleep:
+            time.sleep(sleep)
+
+
+def delete_in_batches(queryset, batch_size=RETENTION_BATCH_SIZE, sleep=0.0, descending=False):
+    """Delete ``queryset`` through ``pk_batches``; return the rows deleted, cascades included."""
+    manager = queryset.model.objects
+    return sum(
+        manager.filter(pk__in=ids).delete()[0]
+        for ids in pk_batches(queryset, batch_size, sleep, descending)
+    )
+
+
+def prune_notifications(batch_size=RETENTION_BATCH_SIZE, sleep=0.0, now=None):
+    """Delete notifications older than their verb's TTL in ``NOTIFICATION_RETENTION_DAYS``."""
+    now = now or timezone.now()
+    retention = settings.NOTIFICATION_RETENTION_DAYS
+    deleted = 0
+    for verb in Notification.Verb.values:
+        days = retention.get(verb, retention["default"])
+        expired = Notification.objects.filter(verb=verb, created_at__lt=now - timedelta(days=days))
+        for ids in pk_batches(expired, batch_size, sleep):
+            batch = Notification.objects.filter(pk__in=ids)
+            recipient_ids = set(batch.values_list("recipient_id", flat=True))
+            deleted += batch.delete()[0]
+            # Expired rows may have been unread; let those badge counters rebuild.
+            invalidate_unread(*recipient_ids)
+    return deleted
+
+
+def purge_deleted_comments(batch_size=RETENTION_BATCH_SIZE, sleep=0.0, now=None):
+    """Hard-delete comments soft-deleted over ``SOFT_DELETE_PURGE_DAYS`` ago.
+
+    A deleted comment that still has replies stays as a placeholder in its thread; scanning
+    newest first removes replies before their parents, so whole deleted branches go in one run.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SOFT_DELETE_PURGE_DAYS)
+    leaves = Comment.objects.filter(is_deleted=True, deleted_at__lt=cutoff).exclude(
+        Exists(Comment.objects.filter(parent=OuterRef("pk")))
+    )
+    return delete_in_batches(leaves, batch_size, sleep, descending=True)
+
+
+def purge_deleted_posts(batch_size=RETENTION_BATCH_SIZE, sleep=0.0, now=None):
+    """Hard-delete posts soft-deleted over ``SOFT_DELETE_PURGE_DAYS`` ago.
+
+    Their timeline entries and comments are removed first in their own batches, so the final
+    ``DELETE`` of each post batch has nothing large left to cascade into.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SOFT_DELETE_PURGE_DAYS)
+    expired = Post.objects.filter(is_deleted=True, deleted_at__lt=cutoff)
+    deleted = 0
+    for post_ids in pk_batches(expired, batch_size, sleep):
+        deleted += delete_in_batches(
+            TimelineEntry.objects.filter(post_id__in=post_ids), batch_size, sleep
+        )
+        deleted += delete_in_batches(
+            Comment.objects.filter(post_id__in=post_ids), batch_size, sleep, descending=True
+        )
+        deleted += Post.objects.filter(pk__in=post_ids).delete()[0]
+    return deleted
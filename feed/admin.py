@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from feed.models import TimelineEntry
+
+
+@admin.register(TimelineEntry)
+class TimelineEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "post", "author", "created_at")
+    search_fields = ("owner__username", "author__username")
+    raw_id_fields = ("owner", "post", "author")
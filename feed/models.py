@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import models
+
+
+class TimelineEntry(models.Model):
+    """A post materialized into one user's home timeline at write time."""
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        db_index=False,
+    )
+    post = models.ForeignKey(
+        "posts.Post",
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    # Denormalized from the post so unfollow/block can prune without a join.
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    # Copied from post.created_at so pages are a range scan on the owner index.
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "post"], name="uniq_timeline_entry"),
+        ]
+        indexes = [
+            models.Index(fields=["owner", "-created_at", "-post"], name="feed_timeline_owner_idx"),
+            models.Index(fields=["owner", "author"], name="feed_timeline_author_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"TimelineEntry({self.owner_id}:{self.post_id})"
+
+
+class HighFanoutAuthor(models.Model):
+    """An author whose posts are merged into timelines at read time instead of fanned out."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="high_fanout",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"HighFanoutAuthor({self.user_id})"
@@ -0,0 +1,173 @@
+import heapq
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from core.db import replica_reads
+from feed.models import HighFanoutAuthor, TimelineEntry
+from groups.access import visible_posts_filter
+from groups.models import Group, Membership
+from posts.models import Post
+from social.models import Follow
+
+FANOUT_BATCH_SIZE = 1000
+FOLLOW_BACKFILL_LIMIT = 20
+RECENT_POSTS_CACHE_KEY = "feed:recent:{author_id}"
+
+User = get_user_model()
+
+
+def _bulk_insert(entries):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def _entry(owner_id, post):
+    return TimelineEntry(
+        owner_id=owner_id,
+        post_id=post.id,
+        author_id=post.author_id,
+        created_at=post.created_at,
+    )
+
+
+def is_high_fanout(author_id):
+    """Return True once an author has reached the follower threshold."""
+    if HighFanoutAuthor.objects.filter(user_id=author_id).exists():
+        return True
+    if not User.objects.filter(
+        pk=author_id, follower_count__gte=settings.FEED_FANOUT_FOLLOWER_THRESHOLD
+    ).exists():
+        return False
+    HighFanoutAuthor.objects.get_or_create(user_id=author_id)
+    return True
+
+
+def fan_out_post(post):
+    """Materialize a new post into the author's and their followers' timelines.
+
+    Posts in private groups only reach followers who are active members. Authors at or above
+    ``FEED_FANOUT_FOLLOWER_THRESHOLD`` are skipped here and merged in at read time instead.
+    """
+    _bulk_insert([_entry(post.author_id, post)])
+    if is_high_fanout(post.author_id):
+        cache.delete(RECENT_POSTS_CACHE_KEY.format(author_id=post.author_id))
+        return
+    follower_ids = Follow.objects.filter(following_id=post.author_id).values_list(
+        "follower_id", flat=True
+    )
+    if post.visibility == Group.Visibility.PRIVATE:
+        follower_ids = follower_ids.filter(
+            follower__group_memberships__group_id=post.group_id,
+            follower__group_memberships__status=Membership.Status.ACTIVE,
+        )
+    _bulk_insert(
+        _entry(owner_id, post) for owner_id in follower_ids.iterator(chunk_size=FANOUT_BATCH_SIZE)
+    )
+
+
+def backfill_author(owner, author_id, limit=FOLLOW_BACKFILL_LIMIT):
+    """Copy an author's most recent visible posts into a new follower's timeline."""
+    if HighFanoutAuthor.objects.filter(user_id=author_id).exists():
+        return
+    posts = (
+        Post.objects.filter(author_id=author_id, is_deleted=False)
+        .filter(visible_posts_filter(owner))
+        .order_by("-created_at", "-id")
+        .only("id", "author_id", "created_at")[:limit]
+    )
+    _bulk_insert(_entry(owner.id, post) for post in posts)
+
+
+def prune_author(owner_id, author_id):
+    """Drop an author's posts from one user's timeline (unfollow/block)."""
+    return TimelineEntry.objects.filter(owner_id=owner_id, author_id=author_id).delete()[0]
+
+
+def _recent_posts(author_ids):
+    """Return ``{author_id: [(created_at, post_id), ...]}`` newest first, cache-backed."""
+    if not author_ids:
+        return {}
+    keys = {RECENT_POSTS_CACHE_KEY.format(author_id=pk): pk for pk in author_ids}
+    cached = cache.get_many(keys)
+    recent = {keys[key]: value for key, value in cached.items()}
+    missing = [author_id for author_id in author_ids if author_id not in recent]
+    if missing:
+        limit = settings.FEED_RECENT_POSTS_PER_AUTHOR
+        rows = (
+            Post.objects.filter(author_id__in=missing, is_deleted=False)
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=F("author_id"),
+                    order_by=[F("created_at").desc(), F("id").desc()],
+                )
+            )
+            .filter(rank__lte=limit)
+            .order_by("author_id", "-created_at", "-id")
+            .values_list("author_id", "created_at", "id")
+        )
+        rebuilt = {author_id: [] for author_id in missing}
+        with replica_reads(False):
+            rows = list(rows)
+        for author_id, created_at, post_id in rows:
+            rebuilt[author_id].append((created_at, post_id))
+        cache.set_many(
+            {RECENT_POSTS_CACHE_KEY.format(author_id=key): value for key, value in rebuilt.items()}
+        )
+        recent.update(rebuilt)
+    return recent
+
+
+def home_timeline(user, before=None, limit=20):
+    """Return up to ``limit`` ``(created_at, post_id)`` keys of ``user``'s home timeline.
+
+    The materialized timeline is k-way merged with the recent posts of followed high-fanout
+    authors. ``before`` is an exclusive ``(created_at, post_id)`` keyset position.
+    """
+    entries = TimelineEntry.objects.filter(owner=user)
+    if before is not None:
+        entries = entries.filter(
+            Q(created_at__lt=before[0]) | Q(created_at=before[0], post_id__lt=before[1])
+        )
+    sources = [
+        entries.order_by("-created_at", "-post_id").values_list("created_at", "post_id")[:limit]
+    ]
+    pulled_ids = list(
+        Follow.objects.filter(follower=user, following__high_fanout__isnull=False).values_list(
+            "following_id", flat=True
+        )
+    )
+    for items in _recent_posts(pulled_ids).values():
+        if before is not None:
+            items = [item for item in items if item < before]
+        sources.append(items)
+
+    seen = set()
+    keys = []
+    for key in heapq.merge(*sources, reverse=True):
+        if key[1] in seen:
+            continue
+        seen.add(key[1])
+        keys.append(key)
+        if len(keys) >= limit:
+            break
+    return keys
+
+
+def hydrate_posts(user, post_ids):
+    """Fetch visible, non-deleted posts for ``post_ids`` preserving their order."""
+    posts = Post.objects.filter(id__in=post_ids, is_deleted=False).filter(
+        visible_posts_filter(user)
+    )
+    by_id = {post.id: post for post in posts}
+    return [by_id[pk] for pk in post_ids if pk in by_id]
@@ -0,0 +1,47 @@
+from rest_framework import generics, permissions, response
+
+from core.pagination import KeysetPagination
+from feed.models import TimelineEntry
+from feed.utils import home_timeline, hydrate_posts
+from posts.serializers import PostSerializer
+
+
+class TimelinePagination(KeysetPagination):
+    """Keyset cursors over merged ``(created_at, post_id)`` timeline keys."""
+
+    ordering = ("-created_at", "-post")
+
+    def start(self, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.model = TimelineEntry
+        reverse, position = self.decode_cursor(request)
+        return None if reverse else position
+
+
+class HomeFeedView(generics.GenericAPIView):
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimelinePagination
+
+    def get(self, request, *args, **kwargs):
+        paginator = self.paginator
+        before = paginator.start(request)
+        keys = home_timeline(
+            request.user,
+            before=tuple(before) if before else None,
+            limit=paginator.page_size + 1,
+        )
+        page = keys[: paginator.page_size]
+        posts = hydrate_posts(request.user, [post_id for _, post_id in page])
+        next_link = None
+        if len(keys) > paginator.page_size:
+            next_link = paginator.encode_cursor(page[-1])
+        return response.Response(
+            {
+                "next": next_link,
+                "previous": None,
+                "results": self.get_serializer(posts, many=True).data,
+            }
+        )
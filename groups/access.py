@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.cache import bump_version, get_version
+from core.db import replica_reads
+from groups.models import Group, Membership
+
+ACCESS_CACHE_KEY = "groups:access:{user_id}:{version}"
+ACCESS_CACHE_TIMEOUT = 60 * 15
+MODERATOR_ROLES = frozenset({Membership.Role.OWNER, Membership.Role.MODERATOR})
+
+
+def _version_name(user_id):
+    return f"memberships:{user_id}"
+
+
+def _group_access(user):
+    """Return ``(active_group_ids, moderated_group_ids)`` for ``user``.
+
+    Memoized on the user instance for the rest of the request and backed by a versioned cache
+    entry, so repeated access checks cost no queries after the first.
+    """
+    if not user.is_authenticated:
+        return frozenset(), frozenset()
+    access = getattr(user, "_group_access", None)
+    if access is None:
+        key = ACCESS_CACHE_KEY.format(user_id=user.pk, version=get_version(_version_name(user.pk)))
+        access = cache.get(key)
+        if access is None:
+            with replica_reads(False):
+                rows = list(
+                    Membership.objects.filter(
+                        user=user, status=Membership.Status.ACTIVE
+                    ).values_list("group_id", "role")
+                )
+            access = (
+                frozenset(group_id for group_id, _ in rows),
+                frozenset(group_id for group_id, role in rows if role in MODERATOR_ROLES),
+            )
+            cache.set(key, access, ACCESS_CACHE_TIMEOUT)
+        user._group_access = access
+    return access
+
+
+def visible_group_ids(user):
+    """Return the ids of groups where ``user`` is an active member."""
+    return _group_access(user)[0]
+
+
+def moderated_group_ids(user):
+    """Return the ids of groups ``user`` actively owns or moderates."""
+    return _group_access(user)[1]
+
+
+def invalidate_memberships(*user_ids):
+    bump_version(*(_version_name(user_id) for user_id in user_ids))
+
+
+def is_group_member(user, group):
+    return group.pk in visible_group_ids(user)
+
+
+def is_group_moderator(user, group):
+    return group.pk in moderated_group_ids(user)
+
+
+def can_view_group(user, group):
+    return group.visibility == Group.Visibility.PUBLIC or is_group_member(user, group)
+
+
+def can_view_post(user, post):
+    return post.visibility == Group.Visibility.PUBLIC or post.group_id in visible_group_ids(user)
+
+
+def visible_posts_filter(user):
+    """``Q`` for posts ``user`` may see: public ones plus those in their own groups."""
+    condition = Q(visibility=Group.Visibility.PUBLIC)
+    group_ids = visible_group_ids(user)
+    if group_ids:
+        condition |= Q(group_id__in=group_ids)
+    return condition
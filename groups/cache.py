@@ -0,0 +1,8 @@
+from core.cache import bump_version
+
+DIRECTORY_SCOPE = "groups:directory"
+
+
+def invalidate_directory():
+    """Expire cached anonymous pages of the public group directory."""
+    bump_version(DIRECTORY_SCOPE)
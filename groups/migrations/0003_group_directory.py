@@ -0,0 +1,60 @@
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_last_post_at(apps, schema_editor):
+    Group = apps.get_model("groups", "Group")
+    Post = apps.get_model("posts", "Post")
+    newest = (
+        Post.objects.filter(group=OuterRef("pk"))
+        .order_by()
+        .values("group")
+        .annotate(newest=Max("created_at"))
+        .values("newest")
+    )
+    Group.objects.update(last_post_at=Coalesce(Subquery(newest), F("created_at")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0002_group_member_count"),
+        ("posts", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="group",
+            name="last_post_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_last_post_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(
+                condition=models.Q(("visibility", "public")),
+                fields=["-member_count", "-id"],
+                name="groups_dir_members_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(
+                condition=models.Q(("visibility", "public")),
+                fields=["-last_post_at", "-id"],
+                name="groups_dir_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(
+                condition=models.Q(("visibility", "public")),
+                fields=["name", "id"],
+                name="groups_dir_name_idx",
+            ),
+        ),
+    ]
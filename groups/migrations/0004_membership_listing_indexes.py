@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0003_group_directory"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="membership",
+            name="groups_memb_group_i_016499_idx",
+        ),
+        migrations.AddIndex(
+            model_name="membership",
+            index=models.Index(
+                fields=["group", "status", "created_at", "id"], name="groups_member_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="membership",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["group", "role", "created_at", "id"],
+                name="groups_member_role_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+from core.counters import count_of, repair_counter
+
+
+def backfill(apps, schema_editor):
+    Group = apps.get_model("groups", "Group")
+    Membership = apps.get_model("groups", "Membership")
+    repair_counter(Group, "member_count", lambda: count_of(Membership, "group", status="active"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0004_membership_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.db import models
 from django.db.models import Q
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -22,6 +23,10 @@ class Group(models.Model):
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="groups_created"
     )
+    # Number of active memberships, maintained with F() updates in groups.views.
+    member_count = models.PositiveIntegerField(default=0)
+    # Time of the newest post (creation time until the first one), set by posts.views.
+    last_post_at = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -29,6 +34,22 @@ class Group(models.Model):
         indexes = [
             models.Index(fields=["slug"]),
             models.Index(fields=["visibility"]),
+            # One index per directory sort order, limited to the public groups it lists.
+            models.Index(
+                fields=["-member_count", "-id"],
+                name="groups_dir_members_idx",
+                condition=Q(visibility="public"),
+            ),
+            models.Index(
+                fields=["-last_post_at", "-id"],
+                name="groups_dir_active_idx",
+                condition=Q(visibility="public"),
+            ),
+            models.Index(
+                fields=["name", "id"],
+                name="groups_dir_name_idx",
+                condition=Q(visibility="public"),
+            ),
         ]
 
     def save(self, *args, **kwargs):
@@ -67,7 +88,15 @@ class Membership(models.Model):
             ),
         ]
         indexes = [
-            models.Index(fields=["group", "status"]),
+            # Member and pending-request listings page through these in join order.
+            models.Index(
+                fields=["group", "status", "created_at", "id"], name="groups_member_status_idx"
+            ),
+            models.Index(
+                fields=["group", "role", "created_at", "id"],
+                name="groups_member_role_idx",
+                condition=Q(status="active"),
+            ),
             models.Index(fields=["user"]),
         ]
 
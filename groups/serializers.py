@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from core.serializers import ValuesSerializer
 from groups.models import Group, Membership
 
 
@@ -14,10 +15,23 @@ class GroupSerializer(serializers.ModelSerializer):
             "visibility",
             "join_policy",
             "created_by",
+            "member_count",
+            "last_post_at",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "slug", "created_by", "created_at", "updated_at")
+        read_only_fields = (
+            "id",
+            "slug",
+            "created_by",
+            "member_count",
+            "last_post_at",
+            "created_at",
+            "updated_at",
+        )
+
+
+GROUP_VALUES = ValuesSerializer(GroupSerializer)
 
 
 class MembershipSerializer(serializers.ModelSerializer):
@@ -25,3 +39,26 @@ class MembershipSerializer(serializers.ModelSerializer):
         model = Membership
         fields = ("id", "user", "group", "role", "status", "created_at")
         read_only_fields = ("id", "user", "group", "created_at")
+
+
+MEMBERSHIP_VALUES = ValuesSerializer(MembershipSerializer)
+
+
+class MembershipReviewSerializer(serializers.Serializer):
+    """Input for bulk review: explicit ``user_ids`` or every request created ``before``."""
+
+    MAX_USER_IDS = 1000
+
+    action = serializers.ChoiceField(choices=["approve", "reject"])
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_USER_IDS,
+        required=False,
+    )
+    before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if ("user_ids" in attrs) == ("before" in attrs):
+            raise serializers.ValidationError("Provide exactly one of user_ids or before.")
+        return attrs
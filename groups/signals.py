@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from groups.access import invalidate_memberships
+from groups.cache import invalidate_directory
+from groups.models import Group, Membership
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+    # After commit, or a concurrent request could re-cache the old membership under the new
+    # version (see users.signals).
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_memberships(user_id))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_directory()
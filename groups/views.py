@@ -1,21 +1,69 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, response, status, views
-
+from rest_framework.exceptions import ValidationError
+
+from core.cache import AnonymousResponseCacheMixin
+from core.pagination import KeysetPagination
+from core.serializers import ValuesListMixin
+from groups.access import (
+    can_view_group,
+    invalidate_memberships,
+    is_group_member,
+    is_group_moderator,
+)
+from groups.cache import DIRECTORY_SCOPE, invalidate_directory
 from groups.models import Group, Membership
-from groups.serializers import GroupSerializer, MembershipSerializer
+from groups.serializers import (
+    GROUP_VALUES,
+    MEMBERSHIP_VALUES,
+    GroupSerializer,
+    MembershipReviewSerializer,
+    MembershipSerializer,
+)
 from notifications.models import Notification
-from notifications.utils import create_notification
+from notifications.utils import bulk_create_notifications, create_notification
 
 User = get_user_model()
 
 
-class GroupCreateView(generics.CreateAPIView):
+class GroupDirectoryPagination(KeysetPagination):
+    """Keyset pages over public groups in the order picked by ``?sort=``."""
+
+    sort_query_param = "sort"
+    orderings = {
+        "members": ("-member_count", "-id"),
+        "active": ("-last_post_at", "-id"),
+        "name": ("name", "id"),
+    }
+    default_sort = "members"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        sort = request.query_params.get(self.sort_query_param, self.default_sort)
+        self.ordering = self.orderings.get(sort, self.orderings[self.default_sort])
+        return super().paginate_queryset(queryset, request, view)
+
+
+class GroupListCreateView(AnonymousResponseCacheMixin, ValuesListMixin, generics.ListCreateAPIView):
     serializer_class = GroupSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    values_serializer = GROUP_VALUES
+    pagination_class = GroupDirectoryPagination
+
+    def get_permissions(self):
+        if self.request.method == "POST":
+            return [permissions.IsAuthenticated()]
+        return [permissions.AllowAny()]
+
+    def get_cache_scopes(self):
+        return [DIRECTORY_SCOPE]
+
+    def get_queryset(self):
+        return Group.objects.filter(visibility=Group.Visibility.PUBLIC)
 
     def perform_create(self, serializer):
-        group = serializer.save(created_by=self.request.user)
+        group = serializer.save(created_by=self.request.user, member_count=1)
         Membership.objects.create(
             user=self.request.user,
             group=group,
@@ -30,9 +78,7 @@ class GroupJoinView(views.APIView):
     def post(self, request, group_id):
         group = get_object_or_404(Group, pk=group_id)
 
-        if Membership.objects.filter(
-            group=group, user=request.user, status=Membership.Status.ACTIVE
-        ).exists():
+        if is_group_member(request.user, group):
             return response.Response({"detail": "Already a member."}, status=status.HTTP_200_OK)
 
         if group.join_policy == Group.JoinPolicy.INVITE:
@@ -53,6 +99,9 @@ class GroupJoinView(views.APIView):
         if not created:
             membership.status = status_value
             membership.save(update_fields=["status"])
+        if status_value == Membership.Status.ACTIVE:
+            Group.objects.filter(pk=group.pk).update(member_count=F("member_count") + 1)
+            invalidate_directory()
 
         return response.Response(
             {"status": membership.status},
@@ -65,13 +114,7 @@ class GroupApproveView(views.APIView):
 
     def post(self, request, group_id, user_id):
         group = get_object_or_404(Group, pk=group_id)
-        is_moderator = Membership.objects.filter(
-            group=group,
-            user=request.user,
-            role__in=[Membership.Role.OWNER, Membership.Role.MODERATOR],
-            status=Membership.Status.ACTIVE,
-        ).exists()
-        if not is_moderator:
+        if not is_group_moderator(request.user, group):
             return response.Response(
                 {"detail": "You do not have permission to approve."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -81,37 +124,127 @@ class GroupApproveView(views.APIView):
         if member.status == Membership.Status.ACTIVE:
             return response.Response({"detail": "Already active."}, status=status.HTTP_200_OK)
 
-        member.status = Membership.Status.ACTIVE
-        member.save(update_fields=["status"])
-        if member.user_id != request.user.id:
-            create_notification(
-                recipient=member.user,
-                actor=request.user,
-                verb=Notification.Verb.GROUP_APPROVED,
-                target=group,
-                data={"group_id": group.id, "group_name": group.name},
-            )
+        with transaction.atomic():
+            member.status = Membership.Status.ACTIVE
+            member.save(update_fields=["status"])
+            Group.objects.filter(pk=group.pk).update(member_count=F("member_count") + 1)
+            if member.user_id != request.user.id:
+                create_notification(
+                    recipient=member.user,
+                    actor=request.user,
+                    verb=Notification.Verb.GROUP_APPROVED,
+                    target=group,
+                    data={"group_id": group.id, "group_name": group.name},
+                )
+        invalidate_directory()
         return response.Response({"detail": "Approved."}, status=status.HTTP_200_OK)
 
 
-class GroupMembersView(generics.ListAPIView):
+class GroupReviewView(views.APIView):
+    """Approve or reject many pending join requests at once.
+
+    One moderator check, one locking read of the affected user ids (needed for notifications
+    and cache invalidation), then a single ``UPDATE``/``DELETE ... WHERE status='pending'``.
+    At most ``review_limit`` requests are handled per call; ``more`` tells the client to repeat.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    review_limit = 1000
+
+    def post(self, request, group_id):
+        group = get_object_or_404(Group, pk=group_id)
+        if not is_group_moderator(request.user, group):
+            return response.Response(
+                {"detail": "You do not have permission to review requests."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        serializer = MembershipReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action = serializer.validated_data["action"]
+
+        pending = Membership.objects.filter(group=group, status=Membership.Status.PENDING)
+        if "user_ids" in serializer.validated_data:
+            candidates = pending.filter(user_id__in=serializer.validated_data["user_ids"])
+        else:
+            candidates = pending.filter(created_at__lt=serializer.validated_data["before"])
+        with transaction.atomic():
+            user_ids = list(
+                candidates.select_for_update()
+                .order_by("created_at", "id")
+                .values_list("user_id", flat=True)[: self.review_limit + 1]
+            )
+            more = len(user_ids) > self.review_limit
+            user_ids = user_ids[: self.review_limit]
+            rows = pending.filter(user_id__in=user_ids)
+            if action == "approve":
+                count = rows.update(status=Membership.Status.ACTIVE)
+                if count:
+                    Group.objects.filter(pk=group.pk).update(member_count=F("member_count") + count)
+                    bulk_create_notifications(
+                        user_ids,
+                        actor=request.user,
+                        verb=Notification.Verb.GROUP_APPROVED,
+                        target=group,
+                        data={"group_id": group.id, "group_name": group.name},
+                    )
+            else:
+                count = rows.delete()[0]
+        if count and action == "approve":
+            # ``update()`` skips the post_save receivers that normally do this.
+            invalidate_memberships(*user_ids)
+            invalidate_directory()
+        key = "approved" if action == "approve" else "rejected"
+        return response.Response({key: count, "more": more}, status=status.HTTP_200_OK)
+
+
+class MemberPagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class GroupMembersView(ValuesListMixin, generics.ListAPIView):
+    """Active members in join order, optionally filtered by ``?role=``.
+
+    A page costs one group lookup and one range query on ``groups_member_status_idx`` (or
+    ``groups_member_role_idx``); the access check is served by the cached resolver.
+    """
+
     serializer_class = MembershipSerializer
+    values_serializer = MEMBERSHIP_VALUES
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MemberPagination
+    member_status = Membership.Status.ACTIVE
+    denied_message = "You do not have access to members."
+
+    def get_group(self):
+        if not hasattr(self, "_group"):
+            self._group = get_object_or_404(Group, pk=self.kwargs["group_id"])
+        return self._group
+
+    def has_group_access(self, group):
+        return can_view_group(self.request.user, group)
 
     def list(self, request, *args, **kwargs):
-        group = get_object_or_404(Group, pk=self.kwargs["group_id"])
-        is_member = Membership.objects.filter(
-            group=group, user=self.request.user, status=Membership.Status.ACTIVE
-        ).exists()
-        if group.visibility == Group.Visibility.PRIVATE and not is_member:
+        if not self.has_group_access(self.get_group()):
             return response.Response(
-                {"detail": "You do not have access to members."},
-                status=status.HTTP_403_FORBIDDEN,
+                {"detail": self.denied_message}, status=status.HTTP_403_FORBIDDEN
             )
         return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
-        group = get_object_or_404(Group, pk=self.kwargs["group_id"])
-        return Membership.objects.filter(group=group, status=Membership.Status.ACTIVE).select_related(
-            "user", "group"
-        )
+        queryset = Membership.objects.filter(group=self.get_group(), status=self.member_status)
+        role = self.request.query_params.get("role")
+        if role:
+            if role not in Membership.Role.values:
+                raise ValidationError({"role": f"Expected one of {Membership.Role.values}."})
+            queryset = queryset.filter(role=role)
+        return queryset
+
+
+class GroupPendingMembersView(GroupMembersView):
+    """Moderator-only queue of pending join requests, oldest first."""
+
+    member_status = Membership.Status.PENDING
+    denied_message = "You do not have permission to review requests."
+
+    def has_group_access(self, group):
+        return is_group_moderator(self.request.user, group)
@@ -0,0 +1,157 @@
+import asyncio
+import contextlib
+import functools
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+CHANNEL_PREFIX = "notifications:"
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def _offer(queue, message):
+    # A subscriber that stopped reading loses its oldest messages instead of growing forever.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class LocalBroker:
+    """In-process pub/sub: publishers on any thread, subscribers on an asyncio event loop.
+
+    A subscriber is one bounded ``asyncio.Queue`` registered under its channel, so an idle
+    stream costs a dict entry and a suspended coroutine, not a thread or a connection.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        self._dispatch(channel, message)
+
+    def publish_many(self, messages):
+        """Publish ``(channel, message)`` pairs."""
+        for channel, message in messages:
+            self._dispatch(channel, message)
+
+    def _dispatch(self, channel, message):
+        with self._lock:
+            targets = list(self._subscribers.get(channel, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(_offer, queue, message)
+
+    def _add(self, channel, entry):
+        with self._lock:
+            first = channel not in self._subscribers
+            self._subscribers[channel].add(entry)
+        return first
+
+    def _remove(self, channel, entry):
+        with self._lock:
+            subscribers = self._subscribers.get(channel, set())
+            subscribers.discard(entry)
+            if subscribers:
+                return False
+            self._subscribers.pop(channel, None)
+            return True
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel):
+        """Yield a queue receiving every message published to ``channel`` while subscribed."""
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        self._add(channel, entry)
+        try:
+            yield entry[1]
+        finally:
+            self._remove(channel, entry)
+
+
+class RedisBroker(LocalBroker):
+    """Redis pub/sub shared by every process; each process holds one subscriber connection.
+
+    Publishing is a synchronous ``PUBLISH``. Local subscribers are fanned out from a single
+    reader task, which subscribes to a Redis channel while at least one local stream wants it.
+    """
+
+    def __init__(self, url):
+        import redis
+        import redis.asyncio
+
+        super().__init__()
+        self._client = redis.Redis.from_url(url)
+        self._async_client = functools.partial(redis.asyncio.Redis.from_url, url)
+        self._pubsub = None
+        self._reader = None
+
+    def publish(self, channel, message):
+        self._client.publish(CHANNEL_PREFIX + channel, json.dumps(message))
+
+    def publish_many(self, messages):
+        """Publish ``(channel, message)`` pairs in one pipelined round trip."""
+        pipeline = self._client.pipeline(transaction=False)
+        for channel, message in messages:
+            pipeline.publish(CHANNEL_PREFIX + channel, json.dumps(message))
+        pipeline.execute()
+
+    async def _ensure_reader(self):
+        if self._reader is None or self._reader.done():
+            self._pubsub = self._async_client().pubsub(ignore_subscribe_messages=True)
+            self._reader = asyncio.get_running_loop().create_task(self._read(self._pubsub))
+
+    async def _read(self, pubsub):
+        while True:
+            if not pubsub.subscribed:
+                await asyncio.sleep(0.5)
+                continue
+            message = await pubsub.get_message(timeout=5.0)
+            if message is not None and message["type"] == "message":
+                channel = message["channel"].decode()[len(CHANNEL_PREFIX) :]
+                self._dispatch(channel, json.loads(message["data"]))
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel):
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        await self._ensure_reader()
+        if self._add(channel, entry):
+            await self._pubsub.subscribe(CHANNEL_PREFIX + channel)
+        try:
+            yield entry[1]
+        finally:
+            if self._remove(channel, entry):
+                await self._pubsub.unsubscribe(CHANNEL_PREFIX + channel)
+
+
+@functools.cache
+def get_broker():
+    """Return the process-wide broker: Redis when ``REDIS_URL`` is set, else in-process."""
+    if settings.REDIS_URL:
+        return RedisBroker(settings.REDIS_URL)
+    return LocalBroker()
+
+
+def publish_notification(notification):
+    """Push ``notification`` to the recipient's live streams once the transaction commits.
+
+    Delivery is best effort: a broker error is logged by Django and never fails the write.
+    """
+    channel = user_channel(notification.recipient_id)
+    message = {"id": notification.id}
+    transaction.on_commit(lambda: get_broker().publish(channel, message), robust=True)
+
+
+def publish_notifications(notifications):
+    """Like ``publish_notification`` for a batch: one on-commit hook and one broker round trip."""
+    messages = [
+        (user_channel(notification.recipient_id), {"id": notification.id})
+        for notification in notifications
+    ]
+    if messages:
+        transaction.on_commit(lambda: get_broker().publish_many(messages), robust=True)
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from core.db import replica_reads
+from notifications.models import Notification
+from notifications.reads import read_state, unread_filter
+
+UNREAD_KEY = "notifications:unread:{user_id}"
+# Present while a counter is being rebuilt; a concurrent adjustment or invalidation deletes it,
+# which tells the rebuild its COUNT may already be stale and must not be cached.
+UNREAD_REBUILD_KEY = "notifications:unread:{user_id}:rebuild"
+UNREAD_REBUILD_TIMEOUT = 60
+
+
+def unread_count(user_id):
+    """Return the cached unread count, counting it from the database on a miss.
+
+    The rebuild sets ``UNREAD_REBUILD_KEY`` before the COUNT and only caches the result if the
+    marker is still there afterwards, so an adjustment that found no counter in between is not
+    lost. Drift that remains (an adjustment whose transaction rolled back, or one racing a
+    commit) lasts at most ``NOTIFICATION_UNREAD_CACHE_TIMEOUT`` seconds, or until
+    ``reconcile_unread`` drops the counter.
+    """
+    key = UNREAD_KEY.format(user_id=user_id)
+    count = cache.get(key)
+    if count is None:
+        marker = UNREAD_REBUILD_KEY.format(user_id=user_id)
+        cache.set(marker, True, timeout=UNREAD_REBUILD_TIMEOUT)
+        with replica_reads(False):
+            count = Notification.objects.filter(
+                unread_filter(read_state(user_id)), recipient_id=user_id
+            ).count()
+        if cache.delete(marker):
+            cache.add(key, count, timeout=settings.NOTIFICATION_UNREAD_CACHE_TIMEOUT)
+    return max(count, 0)
+
+
+def adjust_unread(counts):
+    """Apply ``{user_id: delta}`` to cached counters; missing counters are rebuilt lazily."""
+    missing = []
+    for user_id, delta in counts.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(UNREAD_KEY.format(user_id=user_id), delta)
+        except ValueError:
+            missing.append(user_id)
+    if missing:
+        cache.delete_many([UNREAD_REBUILD_KEY.format(user_id=user_id) for user_id in missing])
+
+
+def reset_unread(user_id, count=0):
+    cache.set(
+        UNREAD_KEY.format(user_id=user_id),
+        count,
+        timeout=settings.NOTIFICATION_UNREAD_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_unread(*user_ids):
+    cache.delete_many(
+        [
+            key.format(user_id=user_id)
+            for user_id in user_ids
+            for key in (UNREAD_KEY, UNREAD_REBUILD_KEY)
+        ]
+    )
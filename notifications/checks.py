@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def outbox_needs_redis(app_configs, **kwargs):
+    """The drain runs in its own process, so only Redis pub/sub reaches the web workers' streams."""
+    if settings.NOTIFICATIONS_OUTBOX and not settings.REDIS_URL:
+        return [
+            Warning(
+                "NOTIFICATIONS_OUTBOX is on without REDIS_URL: notifications delivered by "
+                "drain_notifications never reach live notification streams.",
+                hint="Set REDIS_URL so the drain and the web workers share a broker.",
+                id="notifications.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import DRAIN_BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification outbox events; with --follow, keep polling for new ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DRAIN_BATCH_SIZE)
+        parser.add_argument("--follow", action="store_true")
+        parser.add_argument("--interval", type=float, default=1.0)
+
+    def handle(self, *args, batch_size, follow, interval, **options):
+        processed = 0
+        started = time.monotonic()
+        while True:
+            taken = drain(batch_size=batch_size)
+            processed += taken
+            if taken:
+                continue
+            if not follow:
+                break
+            time.sleep(interval)
+        self.stdout.write(
+            f"drain_notifications: processed {processed} events in "
+            f"{time.monotonic() - started:.2f}s"
+        )
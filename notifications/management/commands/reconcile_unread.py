@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications.cache import invalidate_unread
+from notifications.models import Notification
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop the cached unread counters of users notified in the last --hours, so each is "
+        "recounted from the database on its next read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=24.0)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, hours, batch_size, **options):
+        started = time.monotonic()
+        recipient_ids = (
+            Notification.objects.filter(created_at__gte=timezone.now() - timedelta(hours=hours))
+            .order_by("recipient_id")
+            .values_list("recipient_id", flat=True)
+            .distinct()
+        )
+        dropped = 0
+        batch = []
+        for recipient_id in recipient_ids.iterator(chunk_size=batch_size):
+            batch.append(recipient_id)
+            if len(batch) >= batch_size:
+                invalidate_unread(*batch)
+                dropped += len(batch)
+                batch = []
+        invalidate_unread(*batch)
+        dropped += len(batch)
+        self.stdout.write(
+            f"reconcile_unread: dropped {dropped} counters in {time.monotonic() - started:.2f}s"
+        )
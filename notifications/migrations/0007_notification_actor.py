@@ -0,0 +1,79 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_actors(apps, schema_editor):
+    """Record the actors existing aggregates already know about (the latest and the sample)."""
+    Notification = apps.get_model("notifications", "Notification")
+    NotificationActor = apps.get_model("notifications", "NotificationActor")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    rows = Notification.objects.exclude(group_key="").values_list("id", "actor_id", "sample_actors")
+    batch = []
+    for notification_id, actor_id, sample in rows.iterator(chunk_size=1000):
+        actor_ids = {actor["id"] for actor in sample}
+        if actor_id is not None:
+            actor_ids.add(actor_id)
+        batch.extend((notification_id, pk) for pk in actor_ids)
+        if len(batch) >= 1000:
+            _insert(User, NotificationActor, batch)
+            batch = []
+    _insert(User, NotificationActor, batch)
+
+
+def _insert(User, NotificationActor, pairs):
+    existing = set(User.objects.filter(pk__in={pk for _, pk in pairs}).values_list("pk", flat=True))
+    NotificationActor.objects.bulk_create(
+        [
+            NotificationActor(notification_id=notification_id, actor_id=pk)
+            for notification_id, pk in pairs
+            if pk in existing
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0006_notification_read_state"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationActor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "notification",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="aggregate_actors",
+                        to="notifications.notification",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("notification", "actor"), name="notif_actor_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_actors, migrations.RunPython.noop),
+    ]
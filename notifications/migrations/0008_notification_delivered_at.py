@@ -0,0 +1,46 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created_at(apps, schema_editor):
+    """Existing rows were delivered when created, which keeps current watermarks meaningful."""
+    Notification = apps.get_model("notifications", "Notification")
+    last_pk = 0
+    while True:
+        ids = list(
+            Notification.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:1000]
+        )
+        if not ids:
+            return
+        last_pk = ids[-1]
+        Notification.objects.filter(pk__in=ids).update(delivered_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0007_notification_actor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="delivered_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="notification",
+            name="delivered_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "delivered_at"], name="notif_recipient_delivered_idx"
+            ),
+        ),
+    ]
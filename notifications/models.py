@@ -2,6 +2,7 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.utils import timezone
 
 
 class Notification(models.Model):
@@ -33,16 +34,96 @@ class Notification(models.Model):
     object_id = models.PositiveIntegerField(null=True, blank=True)
     target = GenericForeignKey("content_type", "object_id")
     data = models.JSONField(default=dict, blank=True)
+    # Aggregates ("alice and 41 others commented") share one row per recipient, verb, group key
+    # and aggregation window; plain notifications leave group_key empty.
+    group_key = models.CharField(max_length=64, blank=True, default="")
+    window_start = models.DateTimeField(null=True, blank=True)
+    actor_count = models.PositiveIntegerField(default=1)
+    sample_actors = models.JSONField(default=list, blank=True)
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: outbox delivery copies the time the event happened.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # When the row was inserted (or an aggregate last reopened); read-all watermarks compare this,
+    # so a late outbox delivery carrying an old created_at still arrives unread.
+    delivered_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient", "verb", "group_key", "window_start"],
+                condition=~models.Q(group_key=""),
+                name="notif_aggregate_uniq",
+            ),
+        ]
         indexes = [
-            models.Index(fields=["recipient", "is_read"], name="notif_recipient_read_idx"),
             models.Index(fields=["created_at"], name="notif_created_idx"),
-            models.Index(fields=["recipient", "created_at"], name="notif_recipient_created_idx"),
+            models.Index(
+                fields=["recipient", "-created_at", "-id"], name="notif_recipient_created_id_idx"
+            ),
+            models.Index(
+                fields=["recipient", "delivered_at"], name="notif_recipient_delivered_idx"
+            ),
         ]
         ordering = ["-created_at"]
 
     def __str__(self) -> str:
         return f"Notification({self.recipient_id}:{self.verb})"
+
+
+class NotificationActor(models.Model):
+    """One row per distinct actor folded into an aggregate; ``actor_count`` counts these."""
+
+    notification = models.ForeignKey(
+        Notification, on_delete=models.CASCADE, related_name="aggregate_actors"
+    )
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["notification", "actor"], name="notif_actor_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"NotificationActor({self.notification_id}:{self.actor_id})"
+
+
+class NotificationReadState(models.Model):
+    """Per-user read marker: everything delivered at or before ``read_before`` is read.
+
+    ``read_ids`` is the sparse set of notifications read one by one above the watermark; the
+    legacy ``Notification.is_read`` column still counts as read (and absorbs overflow of the
+    set), so read-all is one write here instead of an ``UPDATE`` over every unread row.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_read_state",
+    )
+    read_before = models.DateTimeField(null=True, blank=True)
+    read_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"NotificationReadState({self.user_id}:{self.read_before})"
+
+
+class NotificationEvent(models.Model):
+    """Outbox row written in the request's transaction and turned into a ``Notification`` later.
+
+    Written instead of a ``Notification`` when ``NOTIFICATIONS_OUTBOX`` is on; the
+    ``drain_notifications`` command delivers and deletes them in batches.
+    """
+
+    recipient_id = models.BigIntegerField()
+    actor_id = models.BigIntegerField(null=True)
+    verb = models.CharField(max_length=40)
+    content_type_id = models.IntegerField(null=True)
+    object_id = models.PositiveIntegerField(null=True)
+    data = models.JSONField(default=dict)
+    group_key = models.CharField(max_length=64, blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"NotificationEvent({self.recipient_id}:{self.verb})"
@@ -0,0 +1,81 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from notifications.broker import publish_notifications
+from notifications.cache import adjust_unread
+from notifications.models import Notification, NotificationEvent
+from notifications.utils import (
+    aggregate_notification,
+    aggregation_window,
+    is_aggregated,
+)
+
+DRAIN_BATCH_SIZE = 500
+
+User = get_user_model()
+
+
+def drain(batch_size=DRAIN_BATCH_SIZE):
+    """Deliver up to ``batch_size`` outbox events as notifications; return how many were processed.
+
+    Events are locked with ``SKIP LOCKED`` (where supported), so several workers can drain
+    concurrently, and they are deleted in the same transaction that inserts the notifications:
+    a crash rolls both back and the batch is delivered again, never lost or duplicated. Events
+    with a group key are first folded per aggregate within the batch, so a burst of comments
+    on one post costs one upsert.
+    """
+    with transaction.atomic():
+        events = list(
+            NotificationEvent.objects.select_for_update(skip_locked=True).order_by("id")[
+                :batch_size
+            ]
+        )
+        if not events:
+            return 0
+        user_ids = {event.recipient_id for event in events}
+        user_ids.update(event.actor_id for event in events if event.actor_id is not None)
+        usernames = dict(User.objects.filter(id__in=user_ids).values_list("id", "username"))
+        plain = []
+        folded = {}
+        # The recipient may have been deleted since the event was written.
+        for event in (event for event in events if event.recipient_id in usernames):
+            actor_id = event.actor_id if event.actor_id in usernames else None
+            if actor_id is None or not is_aggregated(event.group_key):
+                plain.append(
+                    Notification(
+                        recipient_id=event.recipient_id,
+                        actor_id=actor_id,
+                        verb=event.verb,
+                        content_type_id=event.content_type_id,
+                        object_id=event.object_id,
+                        data=event.data,
+                        created_at=event.created_at,
+                    )
+                )
+                continue
+            key = (
+                event.recipient_id,
+                event.verb,
+                event.group_key,
+                aggregation_window(event.created_at),
+            )
+            folded.setdefault(key, []).append(event)
+        Notification.objects.bulk_create(plain)
+        adjust_unread(Counter(notification.recipient_id for notification in plain))
+        publish_notifications(plain)
+        for (recipient_id, verb, group_key, _), group in folded.items():
+            last = group[-1]
+            aggregate_notification(
+                recipient_id,
+                verb,
+                group_key,
+                [{"id": e.actor_id, "username": usernames[e.actor_id]} for e in group],
+                content_type_id=last.content_type_id,
+                object_id=last.object_id,
+                data=last.data,
+                at=last.created_at,
+            )
+        NotificationEvent.objects.filter(id__in=[event.id for event in events]).delete()
+    return len(events)
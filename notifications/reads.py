@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.db.models import Max, Q
+
+from notifications.models import Notification, NotificationReadState
+
+# Individually-read ids kept on the read state; beyond this the oldest spill into is_read.
+MAX_READ_IDS = 500
+
+
+def read_state(user_id):
+    """Return the user's ``NotificationReadState``, or ``None`` if nothing was ever read."""
+    return NotificationReadState.objects.filter(user_id=user_id).first()
+
+
+def unread_filter(state):
+    """Return a ``Q`` matching the notifications ``state`` considers unread."""
+    condition = Q(is_read=False)
+    if state is not None:
+        if state.read_before is not None:
+            condition &= Q(delivered_at__gt=state.read_before)
+        if state.read_ids:
+            condition &= ~Q(id__in=state.read_ids)
+    return condition
+
+
+def is_read(state, notification_id, delivered_at, legacy_is_read=False):
+    if legacy_is_read or state is None:
+        return legacy_is_read
+    if state.read_before is not None and delivered_at <= state.read_before:
+        return True
+    return notification_id in state.read_ids
+
+
+def read_flags(keys):
+    """Batch loader: map ``(recipient_id, id, delivered_at, is_read)`` keys to the read flag.
+
+    One query loads the read state of every recipient on the page.
+    """
+    recipient_ids = {key[0] for key in keys}
+    states = {
+        state.user_id: state
+        for state in NotificationReadState.objects.filter(user_id__in=recipient_ids)
+    }
+    return {key: is_read(states.get(key[0]), *key[1:]) for key in keys}
+
+
+def mark_read(notification):
+    """Mark one notification read; return ``False`` if it already was."""
+    with transaction.atomic():
+        state, _ = NotificationReadState.objects.select_for_update().get_or_create(
+            user_id=notification.recipient_id
+        )
+        if is_read(state, notification.id, notification.delivered_at, notification.is_read):
+            return False
+        state.read_ids.append(notification.id)
+        if len(state.read_ids) > MAX_READ_IDS:
+            state.read_ids.sort()
+            spill = state.read_ids[: len(state.read_ids) - MAX_READ_IDS // 2]
+            Notification.objects.filter(id__in=spill).update(is_read=True)
+            state.read_ids = state.read_ids[len(spill) :]
+        state.save(update_fields=["read_ids", "updated_at"])
+    return True
+
+
+def mark_all_read(user_id):
+    """Move the watermark to the user's newest notification: one write whatever the backlog.
+
+    The watermark is a delivery time, not ``created_at``: outbox events drained after this call
+    are delivered later than it even when they happened earlier, so they stay unread. Only a
+    row inserted before this call but committed after it can still fall under the watermark.
+    """
+    newest = Notification.objects.filter(recipient_id=user_id).aggregate(at=Max("delivered_at"))
+    if newest["at"] is None:
+        return
+    NotificationReadState.objects.update_or_create(
+        user_id=user_id, defaults={"read_before": newest["at"], "read_ids": []}
+    )
+
+
+def reopen(notification, delivered_at):
+    """Unread a notification that gets new activity delivered at ``delivered_at`` (aggregates).
+
+    Drops it from the sparse read set; the caller resets ``is_read`` and saves the new
+    ``delivered_at``. Returns whether it went from read to unread, for the unread counter.
+    """
+    state = (
+        NotificationReadState.objects.select_for_update()
+        .filter(user_id=notification.recipient_id)
+        .first()
+    )
+    was_read = is_read(state, notification.id, notification.delivered_at, notification.is_read)
+    if state is None:
+        return was_read
+    if notification.id in state.read_ids:
+        state.read_ids.remove(notification.id)
+        state.save(update_fields=["read_ids", "updated_at"])
+    return was_read and not (state.read_before is not None and delivered_at <= state.read_before)
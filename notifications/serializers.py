@@ -1,12 +1,17 @@
 from rest_framework import serializers
 
+from core.serializers import ValuesSerializer
+from notifications import reads
 from notifications.models import Notification
+from notifications.targets import target_summaries
 
 
 class NotificationSerializer(serializers.ModelSerializer):
     actor_username = serializers.CharField(source="actor.username", read_only=True)
     target_type = serializers.SerializerMethodField()
     target_id = serializers.IntegerField(source="object_id", read_only=True)
+    target = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
@@ -16,7 +21,10 @@ class NotificationSerializer(serializers.ModelSerializer):
             "verb",
             "target_type",
             "target_id",
+            "target",
             "data",
+            "actor_count",
+            "sample_actors",
             "is_read",
             "created_at",
         )
@@ -26,3 +34,22 @@ class NotificationSerializer(serializers.ModelSerializer):
         if not obj.content_type:
             return None
         return obj.content_type.model
+
+    def get_is_read(self, obj):
+        state = reads.read_state(obj.recipient_id)
+        return reads.is_read(state, obj.id, obj.delivered_at, obj.is_read)
+
+    def get_target(self, obj):
+        key = (obj.content_type_id, obj.object_id)
+        return target_summaries([key]).get(key)
+
+
+NOTIFICATION_VALUES = ValuesSerializer(
+    NotificationSerializer,
+    method_columns={
+        "target_type": "content_type__model",
+        "target": ("content_type_id", "object_id"),
+        "is_read": ("recipient_id", "id", "delivered_at", "is_read"),
+    },
+    batch_loaders={"target": target_summaries, "is_read": reads.read_flags},
+)
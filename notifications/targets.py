@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+
+SNIPPET_LENGTH = 80
+
+
+def _snippet(text):
+    return text if len(text) <= SNIPPET_LENGTH else text[: SNIPPET_LENGTH - 1] + "…"
+
+
+def _post_summaries(model, ids):
+    rows = model.objects.filter(pk__in=ids, is_deleted=False).values("id", "content")
+    return {row["id"]: {"id": row["id"], "snippet": _snippet(row["content"])} for row in rows}
+
+
+def _comment_summaries(model, ids):
+    rows = model.objects.filter(pk__in=ids, is_deleted=False).values("id", "post_id", "content")
+    return {
+        row["id"]: {"id": row["id"], "post_id": row["post_id"], "snippet": _snippet(row["content"])}
+        for row in rows
+    }
+
+
+def _group_summaries(model, ids):
+    rows = model.objects.filter(pk__in=ids).values("id", "name", "slug")
+    return {row["id"]: row for row in rows}
+
+
+def _user_summaries(model, ids):
+    rows = model.objects.filter(pk__in=ids).values("id", "username", "display_name")
+    return {row["id"]: row for row in rows}
+
+
+# Target model label -> loader(model, ids) returning {object_id: summary}.
+TARGET_SUMMARIES = {
+    "posts.Post": _post_summaries,
+    "posts.Comment": _comment_summaries,
+    "groups.Group": _group_summaries,
+    "users.User": _user_summaries,
+}
+
+
+def target_summaries(keys):
+    """Map ``(content_type_id, object_id)`` keys to small target summaries.
+
+    Keys are grouped by content type and each type is fetched with one ``IN`` query, so a page
+    costs at most one query per target type whatever its size or mix of verbs. Deleted targets
+    and types without a summary are left out.
+    """
+    ids_by_type = defaultdict(set)
+    for content_type_id, object_id in keys:
+        if content_type_id is not None and object_id is not None:
+            ids_by_type[content_type_id].add(object_id)
+    summaries = {}
+    for content_type_id, ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        load = TARGET_SUMMARIES.get(model._meta.label) if model is not None else None
+        if load is None:
+            continue
+        for object_id, summary in load(model, ids).items():
+            summaries[(content_type_id, object_id)] = summary
+    return summaries
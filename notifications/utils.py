@@ -1,21 +1,189 @@
+from collections import Counter
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from notifications.broker import publish_notification, publish_notifications
+from notifications.cache import adjust_unread
+from notifications.models import Notification, NotificationActor, NotificationEvent
+from notifications.reads import reopen
+
+NOTIFICATION_BATCH_SIZE = 500
+AGGREGATE_SAMPLE_SIZE = 3
+
+
+def _target_key(target):
+    if target is None:
+        return None, None
+    return ContentType.objects.get_for_model(target.__class__).pk, target.pk
+
+
+def aggregation_window(at):
+    """Return the start of the fixed aggregation window containing ``at``."""
+    window = settings.NOTIFICATION_AGGREGATION_WINDOW_SECONDS
+    seconds = at.timestamp()
+    return datetime.fromtimestamp(seconds - seconds % window, tz=dt_timezone.utc)
+
+
+def is_aggregated(group_key):
+    return bool(group_key) and settings.NOTIFICATION_AGGREGATION_WINDOW_SECONDS > 0
 
-from notifications.models import Notification
 
+def _add_actors(notification, actor_ids):
+    """Record ``actor_ids`` on a locked aggregate; return how many were new to it."""
+    known = set(
+        NotificationActor.objects.filter(
+            notification=notification, actor_id__in=actor_ids
+        ).values_list("actor_id", flat=True)
+    )
+    fresh = [actor_id for actor_id in actor_ids if actor_id not in known]
+    NotificationActor.objects.bulk_create(
+        [NotificationActor(notification=notification, actor_id=actor_id) for actor_id in fresh],
+        ignore_conflicts=True,
+    )
+    return len(fresh)
+
+
+def aggregate_notification(
+    recipient_id,
+    verb,
+    group_key,
+    actors,
+    content_type_id=None,
+    object_id=None,
+    data=None,
+    at=None,
+):
+    """Fold ``actors`` (``{"id", "username"}`` dicts, oldest first) into one aggregate row.
+
+    The row for the recipient, verb, ``group_key`` and the aggregation window containing ``at``
+    is locked and updated in place, or inserted if the window has none yet. It keeps the latest
+    actor and target, moves to the top of the list and becomes unread again (see ``reopen``).
+    Distinct actors are recorded as ``NotificationActor`` rows under the row lock, so
+    ``actor_count`` only grows for actors new to the aggregate, however long ago one left the
+    sample.
+    """
+    at = at or timezone.now()
+    latest = list({actor["id"]: actor for actor in actors}.values())[::-1]
+    lookup = {
+        "recipient_id": recipient_id,
+        "verb": verb,
+        "group_key": group_key,
+        "window_start": aggregation_window(at),
+    }
+    fields = {
+        "actor_id": latest[0]["id"],
+        "content_type_id": content_type_id,
+        "object_id": object_id,
+        "data": data or {},
+        "is_read": False,
+    }
+    with transaction.atomic():
+        row = Notification.objects.select_for_update().filter(**lookup).first()
+        if row is None:
+            try:
+                with transaction.atomic():
+                    row = Notification.objects.create(
+                        **lookup,
+                        **fields,
+                        actor_count=len(latest),
+                        sample_actors=latest[:AGGREGATE_SAMPLE_SIZE],
+                        created_at=at,
+                    )
+                    _add_actors(row, [actor["id"] for actor in latest])
+                adjust_unread({recipient_id: 1})
+                publish_notification(row)
+                return row
+            except IntegrityError:
+                row = Notification.objects.select_for_update().get(**lookup)
+        row.actor_count += _add_actors(row, [actor["id"] for actor in latest])
+        fresh = {actor["id"] for actor in latest}
+        row.sample_actors = (
+            latest + [actor for actor in row.sample_actors if actor["id"] not in fresh]
+        )[:AGGREGATE_SAMPLE_SIZE]
+        delivered_at = timezone.now()
+        reopened = reopen(row, delivered_at)
+        row.created_at = max(row.created_at, at)
+        row.delivered_at = delivered_at
+        for name, value in fields.items():
+            setattr(row, name, value)
+        row.save(
+            update_fields=[*fields, "actor_count", "sample_actors", "created_at", "delivered_at"]
+        )
+    if reopened:
+        adjust_unread({recipient_id: 1})
+    publish_notification(row)
+    return row
 
-def create_notification(recipient, verb, actor=None, target=None, data=None):
+
+def create_notification(recipient, verb, actor=None, target=None, data=None, group_key=""):
+    """Notify ``recipient``; with ``NOTIFICATIONS_OUTBOX`` on, queue an outbox event instead.
+
+    A non-empty ``group_key`` (e.g. ``"post:42"``) collapses notifications with the same
+    recipient, verb and key inside ``NOTIFICATION_AGGREGATION_WINDOW_SECONDS`` into one row.
+    Call it inside the transaction of the write that caused it, so the event commits (or rolls
+    back) with that write.
+    """
     if recipient is None:
         return None
-    content_type = None
-    object_id = None
-    if target is not None:
-        content_type = ContentType.objects.get_for_model(target.__class__)
-        object_id = target.pk
-    return Notification.objects.create(
+    content_type_id, object_id = _target_key(target)
+    if settings.NOTIFICATIONS_OUTBOX:
+        return NotificationEvent.objects.create(
+            recipient_id=recipient.pk,
+            actor_id=actor.pk if actor is not None else None,
+            verb=verb,
+            content_type_id=content_type_id,
+            object_id=object_id,
+            data=data or {},
+            group_key=group_key,
+        )
+    if actor is not None and is_aggregated(group_key):
+        return aggregate_notification(
+            recipient.pk,
+            verb,
+            group_key,
+            [{"id": actor.pk, "username": actor.username}],
+            content_type_id=content_type_id,
+            object_id=object_id,
+            data=data,
+        )
+    notification = Notification.objects.create(
         recipient=recipient,
         actor=actor,
         verb=verb,
-        content_type=content_type,
+        content_type_id=content_type_id,
         object_id=object_id,
         data=data or {},
     )
+    adjust_unread({recipient.pk: 1})
+    publish_notification(notification)
+    return notification
+
+
+def bulk_create_notifications(recipient_ids, verb, actor=None, target=None, data=None):
+    """Insert one notification (or outbox event) per recipient, in batched INSERTs."""
+    content_type_id, object_id = _target_key(target)
+    if settings.NOTIFICATIONS_OUTBOX:
+        model, actor_field = NotificationEvent, {"actor_id": actor.pk if actor else None}
+    else:
+        model, actor_field = Notification, {"actor": actor}
+    rows = [
+        model(
+            recipient_id=recipient_id,
+            verb=verb,
+            content_type_id=content_type_id,
+            object_id=object_id,
+            data=data or {},
+            **actor_field,
+        )
+        for recipient_id in recipient_ids
+    ]
+    created = model.objects.bulk_create(rows, batch_size=NOTIFICATION_BATCH_SIZE)
+    if model is Notification:
+        adjust_unread(Counter(recipient_ids))
+        publish_notifications(created)
+    return created
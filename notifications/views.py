@@ -1,39 +1,61 @@
+import asyncio
+import json
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.db.models import Count, Max
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from rest_framework import generics, permissions, response, status, views
-from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.exceptions import AuthenticationFailed
 
+from core.conditional import conditional_response
+from core.pagination import KeysetPagination
+from core.serializers import ValuesListMixin
+from notifications.broker import get_broker, user_channel
+from notifications.cache import adjust_unread, reset_unread, unread_count
 from notifications.models import Notification
-from notifications.serializers import NotificationSerializer
+from notifications.reads import mark_all_read, mark_read, read_state, unread_filter
+from notifications.serializers import NOTIFICATION_VALUES, NotificationSerializer
+from users.authentication import CookieJWTAuthentication
 
 
-class NotificationPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = "page_size"
-    max_page_size = 100
+class NotificationPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
 
 
-class NotificationCursorPagination(CursorPagination):
-    page_size = 20
-    ordering = "-created_at"
-
-
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ValuesListMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
+    values_serializer = NOTIFICATION_VALUES
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = NotificationPagination
 
+    def list(self, request, *args, **kwargs):
+        # Reading moves the read state, not the rows, so its updated_at is part of the ETag and
+        # no Last-Modified is sent. Aggregates are updated in place, which always moves
+        # delivered_at (created_at stays put when the drain folds in an older event).
+        self.read_state = read_state(request.user.id)
+        state = Notification.objects.filter(recipient=request.user).aggregate(
+            last_id=Max("id"),
+            last_at=Max("delivered_at"),
+            total=Count("id"),
+        )
+        read_at = self.read_state.updated_at if self.read_state else None
+        return conditional_response(
+            request,
+            partial(super().list, request, *args, **kwargs),
+            (state["last_id"], state["last_at"], state["total"], read_at),
+        )
+
     def get_queryset(self):
         queryset = Notification.objects.filter(recipient=self.request.user)
         unread = self.request.query_params.get("unread")
         if unread and unread.lower() in {"1", "true", "yes"}:
-            queryset = queryset.filter(is_read=False)
+            queryset = queryset.filter(unread_filter(self.read_state))
         return queryset
 
-    def get_pagination_class(self):
-        pagination = self.request.query_params.get("pagination")
-        if pagination and pagination.lower() in {"cursor", "c"}:
-            return NotificationCursorPagination
-        return super().get_pagination_class()
-
 
 class NotificationReadView(generics.UpdateAPIView):
     serializer_class = NotificationSerializer
@@ -47,9 +69,8 @@ class NotificationReadView(generics.UpdateAPIView):
                 {"detail": "You do not have access to this notification."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        if not notification.is_read:
-            notification.is_read = True
-            notification.save(update_fields=["is_read"])
+        if mark_read(notification):
+            adjust_unread({request.user.id: -1})
         return response.Response(self.get_serializer(notification).data)
 
 
@@ -57,17 +78,93 @@ class NotificationReadAllView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        updated = Notification.objects.filter(
-            recipient=request.user, is_read=False
-        ).update(is_read=True)
+        updated = unread_count(request.user.id)
+        mark_all_read(request.user.id)
+        reset_unread(request.user.id)
         return response.Response({"updated": updated}, status=status.HTTP_200_OK)
 
 
 class NotificationUnreadCountView(views.APIView):
+    """Badge count served from a cached per-user counter that the write paths keep current."""
+
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(
-            recipient=request.user, is_read=False
-        ).count()
-        return response.Response({"unread": count}, status=status.HTTP_200_OK)
+        return response.Response(
+            {"unread": unread_count(request.user.id)}, status=status.HTTP_200_OK
+        )
+
+
+async def _db_call(func, *args):
+    """Run a short DB call for a stream on a pooled thread and close its connection after.
+
+    The default ``thread_sensitive=True`` would pin one thread (and its open DB connection) to
+    every stream for as long as the client stays connected.
+    """
+
+    def call():
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+
+    return await sync_to_async(call, thread_sensitive=False)()
+
+
+def _stream_user(request):
+    try:
+        result = CookieJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def _stream_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+def _render_notification(user, notification_id):
+    rows = NOTIFICATION_VALUES.values(
+        Notification.objects.filter(pk=notification_id, recipient=user)
+    )
+    items = NOTIFICATION_VALUES.to_representation(rows)
+    return (items[0] if items else None), unread_count(user.id)
+
+
+async def _notification_events(user):
+    async with get_broker().subscribe(user_channel(user.id)) as queue:
+        unread = await _db_call(unread_count, user.id)
+        yield "retry: 5000\n" + _stream_event("unread", {"unread": unread})
+        while True:
+            try:
+                async with asyncio.timeout(settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS):
+                    message = await queue.get()
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            item, unread = await _db_call(_render_notification, user, message["id"])
+            if item is not None:
+                yield _stream_event("notification", item)
+            yield _stream_event("unread", {"unread": unread})
+
+
+async def notification_stream(request):
+    """Server-Sent Events: the current unread count, then each new notification as it lands.
+
+    Only served by the ASGI app (``config.asgi``); WSGI requests get ``501``. An idle stream is a suspended coroutine
+    waiting on a broker queue, holding no thread or DB connection, with a comment line every
+    ``NOTIFICATION_STREAM_HEARTBEAT_SECONDS`` to keep proxies from closing it.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not isinstance(request, ASGIRequest):
+        # WSGI consumes an async iterator whole before responding, so this endless stream would
+        # pin the worker and buffer keepalives forever.
+        return JsonResponse({"detail": "Notification streams require the ASGI server."}, status=501)
+    user = await _db_call(_stream_user, request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    response = StreamingHttpResponse(_notification_events(user), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
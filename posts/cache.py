@@ -0,0 +1,15 @@
+from core.cache import bump_version
+
+FEED_SCOPE = "posts:feed"
+
+
+def group_scope(group_id):
+    return f"posts:group:{group_id}"
+
+
+def invalidate_post_pages(group_id=None):
+    """Expire cached anonymous post pages that may list a post from ``group_id``."""
+    scopes = [FEED_SCOPE]
+    if group_id:
+        scopes.append(group_scope(group_id))
+    bump_version(*scopes)
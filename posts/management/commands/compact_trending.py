@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.trending import COMPACT_BATCH_SIZE, COMPACT_MIN_SCORE, compact
+
+
+class Command(BaseCommand):
+    help = "Drop trending scores that have decayed below --min-score or whose post is deleted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-score", type=float, default=COMPACT_MIN_SCORE)
+        parser.add_argument("--batch-size", type=int, default=COMPACT_BATCH_SIZE)
+
+    def handle(self, *args, min_score, batch_size, **options):
+        started = time.monotonic()
+        deleted = compact(min_score=min_score, batch_size=batch_size)
+        self.stdout.write(
+            f"compact_trending: deleted {deleted} rows in {time.monotonic() - started:.2f}s"
+        )
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0001_initial"),
+        ("posts", "0002_post_comment_report"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="posts_comment_post_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="posts_post_author_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="posts_post_group_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="posts_post_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "created_at", "id"], name="posts_comment_post_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-created_at", "-id"], name="posts_post_created_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-created_at", "-id"], name="posts_post_author_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["group", "-created_at", "-id"], name="posts_post_group_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_visibility(apps, schema_editor):
+    Group = apps.get_model("groups", "Group")
+    Post = apps.get_model("posts", "Post")
+    for group_id in Group.objects.filter(visibility="private").values_list("id", flat=True):
+        while True:
+            ids = list(
+                Post.objects.filter(group_id=group_id)
+                .exclude(visibility="private")
+                .values_list("id", flat=True)[:BATCH_SIZE]
+            )
+            if not ids:
+                break
+            Post.objects.filter(id__in=ids).update(visibility="private")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0001_initial"),
+        ("posts", "0003_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="visibility",
+            field=models.CharField(
+                choices=[("public", "Public"), ("private", "Private")],
+                default="public",
+                max_length=10,
+            ),
+        ),
+        migrations.RunPython(backfill_visibility, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["visibility", "-created_at", "-id"],
+                name="posts_post_visibility_idx",
+            ),
+        ),
+    ]
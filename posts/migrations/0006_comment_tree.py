@@ -0,0 +1,89 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+PATH_STEP = 10
+
+
+def backfill_paths(apps, schema_editor):
+    """Fill root/depth/path in id order; a parent is always older than its replies."""
+    Comment = apps.get_model("posts", "Comment")
+    last_id = 0
+    while True:
+        batch = list(
+            Comment.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "parent_id")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        parent_ids = {c.parent_id for c in batch if c.parent_id}
+        known = {
+            row["id"]: row
+            for row in Comment.objects.filter(id__in=parent_ids).values(
+                "id", "root_id", "path", "depth"
+            )
+        }
+        for comment in batch:
+            parent = known.get(comment.parent_id)
+            segment = str(comment.id).zfill(PATH_STEP)
+            if parent is None:
+                comment.root_id, comment.depth, comment.path = None, 0, segment
+            else:
+                comment.root_id = parent["root_id"] or parent["id"]
+                comment.depth = parent["depth"] + 1
+                comment.path = f"{parent['path']}/{segment}"
+            known[comment.id] = {
+                "id": comment.id,
+                "root_id": comment.root_id,
+                "path": comment.path,
+                "depth": comment.depth,
+            }
+        Comment.objects.bulk_update(batch, ["root", "depth", "path"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0005_post_comment_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.CharField(blank=True, default="", max_length=220),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="root",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="posts.comment",
+            ),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False), ("parent__isnull", True)),
+                fields=["post", "created_at", "id"],
+                name="posts_comment_top_level_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["root", "path"], name="posts_comment_root_path_idx"),
+        ),
+    ]
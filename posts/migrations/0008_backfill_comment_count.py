@@ -0,0 +1,20 @@
+from django.db import migrations
+
+from core.counters import count_of, repair_counter
+
+
+def backfill(apps, schema_editor):
+    Post = apps.get_model("posts", "Post")
+    Comment = apps.get_model("posts", "Comment")
+    repair_counter(Post, "comment_count", lambda: count_of(Comment, "post", is_deleted=False))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0007_trending_score"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import Q
 
 from groups.models import Group
 
@@ -20,6 +21,13 @@ class Post(models.Model):
         blank=True,
     )
     content = models.TextField(max_length=2000)
+    # Denormalized from group.visibility (public when there is no group) so feeds can filter
+    # without joining groups; kept in sync by posts.signals.
+    visibility = models.CharField(
+        max_length=10, choices=Group.Visibility.choices, default=Group.Visibility.PUBLIC
+    )
+    # Number of non-deleted comments, maintained with F() updates in posts.views.
+    comment_count = models.PositiveIntegerField(default=0)
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -27,16 +35,54 @@ class Post(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["author"], name="posts_post_author_idx"),
-            models.Index(fields=["group"], name="posts_post_group_idx"),
-            models.Index(fields=["-created_at"], name="posts_post_created_idx"),
+            models.Index(
+                fields=["visibility", "-created_at", "-id"],
+                name="posts_post_visibility_idx",
+                condition=Q(is_deleted=False),
+            ),
+            # Keyset pagination orders every feed on (created_at, id).
+            models.Index(fields=["-created_at", "-id"], name="posts_post_created_id_idx"),
+            models.Index(
+                fields=["author", "-created_at", "-id"], name="posts_post_author_created_idx"
+            ),
+            models.Index(
+                fields=["group", "-created_at", "-id"], name="posts_post_group_created_idx"
+            ),
         ]
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.group_id:
+            self.visibility = self.group.visibility
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"Post({self.id})"
 
 
+class TrendingScore(models.Model):
+    """Time-decayed engagement score of a post, maintained incrementally by posts.trending."""
+
+    post = models.OneToOneField(
+        Post, on_delete=models.CASCADE, primary_key=True, related_name="trending"
+    )
+    # ln(sum(weight * e^((t - TRENDING_EPOCH) / tau))) over the post's activity. Every post
+    # decays at the same rate, so ordering by the stored value is the current ranking.
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=["-score"], name="posts_trending_score_idx")]
+
+    def __str__(self) -> str:
+        return f"TrendingScore({self.post_id}:{self.score:.3f})"
+
+
 class Comment(models.Model):
+    # Each path segment is the zero-padded id of an ancestor, so sorting by path yields
+    # depth-first thread order and a subtree is the path range (path + "/", path + "0").
+    PATH_STEP = 10
+    PATH_SEPARATOR = "/"
+    MAX_DEPTH = 20
+
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -50,6 +96,16 @@ class Comment(models.Model):
         null=True,
         blank=True,
     )
+    # Top-level comment of the thread; null for top-level comments themselves.
+    root = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    path = models.CharField(max_length=(PATH_STEP + 1) * MAX_DEPTH, blank=True, default="")
+    depth = models.PositiveSmallIntegerField(default=0)
     content = models.TextField(max_length=1000)
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
@@ -58,11 +114,38 @@ class Comment(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["post"], name="posts_comment_post_idx"),
+            models.Index(
+                fields=["post", "created_at", "id"], name="posts_comment_post_created_idx"
+            ),
+            models.Index(
+                fields=["post", "created_at", "id"],
+                name="posts_comment_top_level_idx",
+                condition=Q(parent__isnull=True, is_deleted=False),
+            ),
+            models.Index(fields=["root", "path"], name="posts_comment_root_path_idx"),
             models.Index(fields=["author"], name="posts_comment_author_idx"),
             models.Index(fields=["-created_at"], name="posts_comment_created_idx"),
         ]
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding and self.parent_id:
+            self.root_id = self.parent.root_id or self.parent_id
+            self.depth = self.parent.depth + 1
+        super().save(*args, **kwargs)
+        if adding:
+            self.path = self.build_path(self.parent.path if self.parent_id else "", self.id)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    @classmethod
+    def build_path(cls, parent_path, comment_id):
+        segment = str(comment_id).zfill(cls.PATH_STEP)
+        return f"{parent_path}{cls.PATH_SEPARATOR}{segment}" if parent_path else segment
+
+    def subtree_range(self):
+        """Return the exclusive ``(low, high)`` path bounds of this comment's descendants."""
+        return f"{self.path}{self.PATH_SEPARATOR}", f"{self.path}0"
+
     def __str__(self) -> str:
         return f"Comment({self.id})"
 
@@ -1,6 +1,7 @@
 from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
 
+from core.serializers import ValuesSerializer
 from posts.models import Comment, Post, Report
 
 
@@ -12,10 +13,11 @@ class PostSerializer(serializers.ModelSerializer):
             "author",
             "group",
             "content",
+            "comment_count",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "author", "created_at", "updated_at")
+        read_only_fields = ("id", "author", "comment_count", "created_at", "updated_at")
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -26,11 +28,21 @@ class CommentSerializer(serializers.ModelSerializer):
             "post",
             "author",
             "parent",
+            "depth",
             "content",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "post", "author", "created_at", "updated_at")
+        read_only_fields = ("id", "post", "author", "depth", "created_at", "updated_at")
+
+    def validate_parent(self, parent):
+        if parent and parent.depth + 1 >= Comment.MAX_DEPTH:
+            raise serializers.ValidationError("Reply thread is too deep.")
+        return parent
+
+
+POST_VALUES = ValuesSerializer(PostSerializer)
+COMMENT_VALUES = ValuesSerializer(CommentSerializer)
 
 
 class ReportSerializer(serializers.ModelSerializer):
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from groups.models import Group
+from posts.cache import invalidate_post_pages
+from posts.models import Post
+
+VISIBILITY_BATCH_SIZE = 1000
+
+
+def sync_post_visibility(group_id, visibility, batch_size=VISIBILITY_BATCH_SIZE):
+    """Copy a group's visibility onto its posts in primary-key batches."""
+    updated = 0
+    while True:
+        ids = list(
+            Post.objects.filter(group_id=group_id)
+            .exclude(visibility=visibility)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return updated
+        updated += Post.objects.filter(id__in=ids).update(visibility=visibility)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if not created and sync_post_visibility(instance.id, instance.visibility):
+        invalidate_post_pages(instance.id)
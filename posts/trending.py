@@ -0,0 +1,75 @@
+import math
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Exp, Greatest, Ln
+from django.utils import timezone
+
+from posts.models import TrendingScore
+
+# Scores are stored relative to a fixed epoch; see TrendingScore.score.
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+REPLY_WEIGHT = 1.0
+REPORT_PENALTY = 0.5
+COMPACT_MIN_SCORE = 0.05
+COMPACT_BATCH_SIZE = 1000
+
+
+def _tau_seconds():
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+def log_score(weight, at=None):
+    """Return ``weight`` observed at ``at`` in the stored log-space scale."""
+    at = at or timezone.now()
+    return math.log(weight) + (at - TRENDING_EPOCH).total_seconds() / _tau_seconds()
+
+
+def record_activity(post_id, weight, at=None):
+    """Add ``weight`` to a post's decayed score with one atomic ``UPDATE``.
+
+    The stored value is a log-sum, so adding is ``logaddexp(score, new)``; it is computed in
+    SQL as ``m + ln(e^(score - m) + e^(new - m))`` with ``m = max(score, new)`` so it never
+    overflows.
+    """
+    value = Value(log_score(weight, at), output_field=FloatField())
+    peak = Greatest(F("score"), value)
+    updated = TrendingScore.objects.filter(post_id=post_id).update(
+        score=peak + Ln(Exp(F("score") - peak) + Exp(value - peak))
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            TrendingScore.objects.create(post_id=post_id, score=log_score(weight, at))
+    except IntegrityError:
+        record_activity(post_id, weight, at)
+
+
+def penalize(post_id, factor=REPORT_PENALTY):
+    """Scale a post's decayed score by ``factor`` (a shift in log space)."""
+    TrendingScore.objects.filter(post_id=post_id).update(score=F("score") + math.log(factor))
+
+
+def compact(min_score=COMPACT_MIN_SCORE, batch_size=COMPACT_BATCH_SIZE):
+    """Delete scores that decayed below ``min_score`` or belong to deleted posts.
+
+    Returns the number of rows deleted. Decayed rows are a range scan on the score index.
+    """
+    floor = log_score(min_score)
+    deleted = 0
+    for queryset in (
+        TrendingScore.objects.filter(score__lt=floor),
+        TrendingScore.objects.filter(post__is_deleted=True),
+    ):
+        while True:
+            ids = list(queryset.values_list("post_id", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += TrendingScore.objects.filter(post_id__in=ids).delete()[0]
+    return deleted
@@ -1,39 +1,83 @@
-from django.db.models import Q
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, response, status
-from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.exceptions import PermissionDenied
 
-from groups.models import Group, Membership
+from core.cache import AnonymousResponseCacheMixin
+from core.conditional import conditional_response
+from core.pagination import KeysetPagination, positive_int
+from core.serializers import ValuesListMixin
+from feed.utils import fan_out_post
+from groups.access import can_view_group, can_view_post, is_group_member, visible_posts_filter
+from groups.cache import invalidate_directory
+from groups.models import Group
 from notifications.models import Notification
 from notifications.utils import create_notification
-from posts.models import Comment, Post, Report
-from posts.serializers import CommentSerializer, PostSerializer, ReportSerializer
-
-
-def _is_group_member(user, group):
-    if not user.is_authenticated:
-        return False
-    return Membership.objects.filter(
-        group=group, user=user, status=Membership.Status.ACTIVE
-    ).exists()
-
-
-class PostPageNumberPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = "page_size"
-    max_page_size = 100
-
-
-class PostCursorPagination(CursorPagination):
-    page_size = 20
-    ordering = "-created_at"
-
-
-class PostListCreateView(generics.ListCreateAPIView):
+from posts.cache import FEED_SCOPE, group_scope, invalidate_post_pages
+from posts import trending
+from posts.models import Comment, Post, Report, TrendingScore
+from posts.serializers import (
+    COMMENT_VALUES,
+    POST_VALUES,
+    CommentSerializer,
+    PostSerializer,
+    ReportSerializer,
+)
+from social.blocks import HideBlockedAuthorsMixin, blocked_user_ids, blocks_version
+
+
+class PostPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class ReplyPagination(KeysetPagination):
+    # Paths are unique and sort depth-first, so they are a complete keyset on their own.
+    ordering = ("path",)
+
+
+def _first_replies(root_ids, limit):
+    """Return the first ``limit + 1`` replies (path order) of every thread in one query."""
+    return (
+        Comment.objects.filter(root_id__in=root_ids, is_deleted=False)
+        .annotate(rank=Window(RowNumber(), partition_by=F("root_id"), order_by=F("path").asc()))
+        .filter(rank__lte=limit + 1)
+        .order_by("path")
+    )
+
+
+def _nest(nodes):
+    """Attach serialized comments to their parents; ``nodes`` must be in path order."""
+    by_id = {}
+    roots = []
+    for node in nodes:
+        node["replies"] = []
+        by_id[node["id"]] = node
+        parent = by_id.get(node["parent"])
+        (parent["replies"] if parent else roots).append(node)
+    return roots
+
+
+class PostListCreateView(
+    AnonymousResponseCacheMixin,
+    ValuesListMixin,
+    HideBlockedAuthorsMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = PostSerializer
-    pagination_class = PostPageNumberPagination
+    values_serializer = POST_VALUES
+    pagination_class = PostPagination
+
+    def get_cache_scopes(self):
+        return [FEED_SCOPE]
 
     def get_permissions(self):
         if self.request.method == "POST":
@@ -41,78 +85,49 @@ class PostListCreateView(generics.ListCreateAPIView):
         return [permissions.AllowAny()]
 
     def get_queryset(self):
-        queryset = (
-            Post.objects.select_related("author", "group")
-            .filter(is_deleted=False)
-            .order_by("-created_at")
-        )
-        user = self.request.user
-        if user.is_authenticated:
-            member_group_ids = Membership.objects.filter(
-                user=user, status=Membership.Status.ACTIVE
-            ).values_list("group_id", flat=True)
-            return queryset.filter(
-                Q(group__isnull=True)
-                | Q(group__visibility=Group.Visibility.PUBLIC)
-                | Q(group_id__in=member_group_ids)
-            )
-        return queryset.filter(Q(group__isnull=True) | Q(group__visibility=Group.Visibility.PUBLIC))
+        return Post.objects.filter(is_deleted=False).filter(visible_posts_filter(self.request.user))
 
     def perform_create(self, serializer):
         group = serializer.validated_data.get("group")
-        if group and not _is_group_member(self.request.user, group):
+        if group and not is_group_member(self.request.user, group):
             raise PermissionDenied("You must be a group member to post.")
-        serializer.save(author=self.request.user)
-
-    def get_pagination_class(self):
-        pagination = self.request.query_params.get("pagination")
-        if pagination and pagination.lower() in {"cursor", "c"}:
-            return PostCursorPagination
-        return super().get_pagination_class()
+        post = serializer.save(author=self.request.user)
+        invalidate_post_pages(post.group_id)
+        if group:
+            Group.objects.filter(pk=group.pk).update(last_post_at=post.created_at)
+            invalidate_directory()
+        trending.record_activity(post.id, trending.POST_WEIGHT, post.created_at)
+        fan_out_post(post)
 
 
-class UserPostsView(generics.ListAPIView):
+class UserPostsView(ValuesListMixin, HideBlockedAuthorsMixin, generics.ListAPIView):
     serializer_class = PostSerializer
+    values_serializer = POST_VALUES
     permission_classes = [permissions.AllowAny]
-    pagination_class = PostPageNumberPagination
+    pagination_class = PostPagination
 
     def get_queryset(self):
-        queryset = (
-            Post.objects.select_related("author", "group")
-            .filter(is_deleted=False)
-            .order_by("-created_at")
+        if self.kwargs["user_id"] in blocked_user_ids(self.request.user):
+            return Post.objects.none()
+        return Post.objects.filter(author_id=self.kwargs["user_id"], is_deleted=False).filter(
+            visible_posts_filter(self.request.user)
         )
-        user = self.request.user
-        member_group_ids = []
-        if user.is_authenticated:
-            member_group_ids = Membership.objects.filter(
-                user=user, status=Membership.Status.ACTIVE
-            ).values_list("group_id", flat=True)
-        return queryset.filter(
-            author_id=self.kwargs["user_id"]
-        ).filter(
-            Q(group__isnull=True)
-            | Q(group__visibility=Group.Visibility.PUBLIC)
-            | Q(group_id__in=member_group_ids)
-        )
-
-    def get_pagination_class(self):
-        pagination = self.request.query_params.get("pagination")
-        if pagination and pagination.lower() in {"cursor", "c"}:
-            return PostCursorPagination
-        return super().get_pagination_class()
 
 
-class GroupPostsView(generics.ListAPIView):
+class GroupPostsView(
+    AnonymousResponseCacheMixin, ValuesListMixin, HideBlockedAuthorsMixin, generics.ListAPIView
+):
     serializer_class = PostSerializer
+    values_serializer = POST_VALUES
     permission_classes = [permissions.AllowAny]
-    pagination_class = PostPageNumberPagination
+    pagination_class = PostPagination
+
+    def get_cache_scopes(self):
+        return [group_scope(self.kwargs["group_id"])]
 
     def list(self, request, *args, **kwargs):
         group = get_object_or_404(Group, pk=self.kwargs["group_id"])
-        if group.visibility == Group.Visibility.PRIVATE and not _is_group_member(
-            request.user, group
-        ):
+        if not can_view_group(request.user, group):
             return response.Response(
                 {"detail": "You do not have access to this group."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -120,21 +135,13 @@ class GroupPostsView(generics.ListAPIView):
         return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
-        return (
-            Post.objects.filter(group_id=self.kwargs["group_id"], is_deleted=False)
-            .select_related("author", "group")
-            .order_by("-created_at")
-        )
-
-    def get_pagination_class(self):
-        pagination = self.request.query_params.get("pagination")
-        if pagination and pagination.lower() in {"cursor", "c"}:
-            return PostCursorPagination
-        return super().get_pagination_class()
+        return Post.objects.filter(group_id=self.kwargs["group_id"], is_deleted=False)
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(ValuesListMixin, HideBlockedAuthorsMixin, generics.ListCreateAPIView):
     serializer_class = CommentSerializer
+    values_serializer = COMMENT_VALUES
+    pagination_class = CommentPagination
 
     def get_permissions(self):
         if self.request.method == "POST":
@@ -142,30 +149,52 @@ class CommentListCreateView(generics.ListCreateAPIView):
         return [permissions.AllowAny()]
 
     def _get_post(self):
-        return get_object_or_404(Post, pk=self.kwargs["post_id"], is_deleted=False)
+        if not hasattr(self, "_post"):
+            self._post = get_object_or_404(Post, pk=self.kwargs["post_id"], is_deleted=False)
+        return self._post
 
     def _ensure_can_view_post(self, request, post):
-        if post.group and post.group.visibility == Group.Visibility.PRIVATE:
-            if not _is_group_member(request.user, post.group):
-                return response.Response(
-                    {"detail": "You do not have access to this post."},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
+        if not can_view_post(request.user, post):
+            return response.Response(
+                {"detail": "You do not have access to this post."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
         return None
 
+    def _conditional_list(self, request, render):
+        """Run ``render`` unless the client's copy of this post's comments is current.
+
+        The validators aggregate over all of the post's comments, including soft-deleted ones,
+        whose ``updated_at`` moves on delete.
+        """
+        state = Comment.objects.filter(post_id=self.kwargs["post_id"]).aggregate(
+            last_modified=Max("updated_at"),
+            last_id=Max("id"),
+            visible=Count("id", filter=Q(is_deleted=False)),
+        )
+        return conditional_response(
+            request,
+            render,
+            (
+                state["last_modified"],
+                state["last_id"],
+                state["visible"],
+                blocks_version(request.user),
+            ),
+            state["last_modified"],
+        )
+
     def list(self, request, *args, **kwargs):
         post = self._get_post()
         denied = self._ensure_can_view_post(request, post)
         if denied:
             return denied
-        return super().list(request, *args, **kwargs)
+        return self._conditional_list(request, partial(super().list, request, *args, **kwargs))
 
     def get_queryset(self):
-        return (
-            Comment.objects.filter(post_id=self.kwargs["post_id"], is_deleted=False)
-            .select_related("author", "post")
-            .order_by("created_at")
-        )
+        return Comment.objects.filter(
+            post_id=self.kwargs["post_id"], is_deleted=False
+        ).select_related("author", "post")
 
     def create(self, request, *args, **kwargs):
         post = self._get_post()
@@ -174,12 +203,20 @@ class CommentListCreateView(generics.ListCreateAPIView):
             return denied
         return super().create(request, *args, **kwargs)
 
+    @transaction.atomic
     def perform_create(self, serializer):
         post = self._get_post()
         parent = serializer.validated_data.get("parent")
         if parent and parent.post_id != post.id:
             raise PermissionDenied("Parent comment must belong to the same post.")
         comment = serializer.save(author=self.request.user, post=post)
+        Post.objects.filter(pk=post.id).update(comment_count=F("comment_count") + 1)
+        invalidate_post_pages(post.group_id)
+        trending.record_activity(
+            post.id,
+            trending.REPLY_WEIGHT if parent else trending.COMMENT_WEIGHT,
+            comment.created_at,
+        )
         if parent and parent.author_id != self.request.user.id:
             create_notification(
                 recipient=parent.author,
@@ -187,6 +224,7 @@ class CommentListCreateView(generics.ListCreateAPIView):
                 verb=Notification.Verb.REPLIED,
                 target=comment,
                 data={"post_id": post.id},
+                group_key=f"comment:{parent.id}",
             )
         elif post.author_id != self.request.user.id:
             create_notification(
@@ -195,22 +233,168 @@ class CommentListCreateView(generics.ListCreateAPIView):
                 verb=Notification.Verb.COMMENTED,
                 target=comment,
                 data={"post_id": post.id},
+                group_key=f"post:{post.id}",
             )
 
 
+class CommentThreadListView(CommentListCreateView):
+    """Top-level comments of a post, each with its first ``replies`` replies nested.
+
+    A page costs one keyset query for the top-level comments and one windowed query for the
+    replies of every thread on the page, whatever the thread sizes.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    replies_query_param = "replies"
+    default_replies = 3
+    max_replies = 20
+
+    def get_queryset(self):
+        return Comment.objects.filter(
+            post_id=self.kwargs["post_id"], parent__isnull=True, is_deleted=False
+        )
+
+    def get_replies_limit(self):
+        try:
+            limit = int(self.request.query_params[self.replies_query_param])
+        except (KeyError, ValueError):
+            return self.default_replies
+        return max(0, min(limit, self.max_replies))
+
+    def list(self, request, *args, **kwargs):
+        post = self._get_post()
+        denied = self._ensure_can_view_post(request, post)
+        if denied:
+            return denied
+        return self._conditional_list(request, self._render_threads)
+
+    def _render_threads(self):
+        threads = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        limit = self.get_replies_limit()
+        replies = []
+        if threads:
+            blocked = blocked_user_ids(self.request.user)
+            replies = [
+                reply
+                for reply in _first_replies([thread.id for thread in threads], limit)
+                if reply.author_id not in blocked
+            ]
+
+        data = self.get_serializer(threads, many=True).data
+        reply_data = self.get_serializer(replies, many=True).data
+        shown = {thread["id"]: [] for thread in data}
+        for reply, node in zip(replies, reply_data):
+            shown[reply.root_id].append(node)
+        for thread in data:
+            thread["replies"] = _nest(shown[thread["id"]][:limit])
+            thread["has_more_replies"] = len(shown[thread["id"]]) > limit
+        return self.get_paginated_response(data)
+
+
+class CommentRepliesView(ValuesListMixin, HideBlockedAuthorsMixin, generics.ListAPIView):
+    """All replies under one comment (its whole subtree) in depth-first order."""
+
+    serializer_class = CommentSerializer
+    values_serializer = COMMENT_VALUES
+    permission_classes = [permissions.AllowAny]
+    pagination_class = ReplyPagination
+
+    def list(self, request, *args, **kwargs):
+        self.comment = get_object_or_404(
+            Comment.objects.select_related("post"),
+            pk=self.kwargs["pk"],
+            is_deleted=False,
+            post__is_deleted=False,
+        )
+        if not can_view_post(request.user, self.comment.post):
+            return response.Response(
+                {"detail": "You do not have access to this post."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        low, high = self.comment.subtree_range()
+        return Comment.objects.filter(
+            root_id=self.comment.root_id or self.comment.id,
+            path__gt=low,
+            path__lt=high,
+            is_deleted=False,
+        )
+
+
+class TrendingPostsView(HideBlockedAuthorsMixin, generics.ListAPIView):
+    """Top posts by time-decayed engagement: one query on the trending score index."""
+
+    serializer_class = PostSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+    limit_query_param = "limit"
+    default_limit = 20
+    max_limit = 50
+
+    def get_queryset(self):
+        return (
+            Post.objects.filter(trending__isnull=False, is_deleted=False)
+            .filter(visible_posts_filter(self.request.user))
+            .order_by("-trending__score", "-id")
+        )
+
+    def get_limit(self):
+        try:
+            return positive_int(
+                self.request.query_params[self.limit_query_param], cutoff=self.max_limit
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def list(self, request, *args, **kwargs):
+        queryset = POST_VALUES.values(self.filter_queryset(self.get_queryset()))
+        rows = queryset[: self.get_limit()]
+        if self.row_filter:
+            rows = filter(self.row_filter, rows)
+        return response.Response({"results": POST_VALUES.to_representation(rows)})
+
+
 class PostDetailView(generics.RetrieveDestroyAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Post.objects.select_related("author", "group").filter(is_deleted=False)
+    queryset = Post.objects.filter(is_deleted=False).annotate(
+        last_comment_at=Subquery(
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by("-updated_at")
+            .values("updated_at")[:1]
+        )
+    )
     lookup_field = "id"
     lookup_url_kwarg = "post_id"
 
+    def get_object(self):
+        post = super().get_object()
+        if not can_view_post(self.request.user, post):
+            raise PermissionDenied("You do not have access to this post.")
+        return post
+
+    def retrieve(self, request, *args, **kwargs):
+        post = self.get_object()
+        # comment_count moves through F() updates that leave post.updated_at alone, so the
+        # latest comment write counts as a modification of the post too.
+        last_modified = max(filter(None, (post.updated_at, post.last_comment_at)))
+        return conditional_response(
+            request,
+            lambda: response.Response(self.get_serializer(post).data),
+            (post.updated_at, post.comment_count, post.last_comment_at),
+            last_modified,
+        )
+
     def perform_destroy(self, instance):
         if instance.author_id != self.request.user.id and not self.request.user.is_staff:
             raise PermissionDenied("You do not have permission to delete this post.")
         instance.is_deleted = True
         instance.deleted_at = timezone.now()
         instance.save(update_fields=["is_deleted", "deleted_at"])
+        invalidate_post_pages(instance.group_id)
+        TrendingScore.objects.filter(post=instance).delete()
 
 
 class CommentDetailView(generics.RetrieveDestroyAPIView):
@@ -223,7 +407,11 @@ class CommentDetailView(generics.RetrieveDestroyAPIView):
             raise PermissionDenied("You do not have permission to delete this comment.")
         instance.is_deleted = True
         instance.deleted_at = timezone.now()
-        instance.save(update_fields=["is_deleted", "deleted_at"])
+        instance.save(update_fields=["is_deleted", "deleted_at", "updated_at"])
+        Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+            comment_count=F("comment_count") - 1
+        )
+        invalidate_post_pages(instance.post.group_id)
 
 
 class ReportCreateView(generics.CreateAPIView):
@@ -232,4 +420,6 @@ class ReportCreateView(generics.CreateAPIView):
     queryset = Report.objects.all()
 
     def perform_create(self, serializer):
-        serializer.save(reporter=self.request.user)
+        report = serializer.save(reporter=self.request.user)
+        if report.content_type.model_class() is Post:
+            trending.penalize(report.object_id)
@@ -0,0 +1,87 @@
+"""Block filtering benchmark.
+
+For viewers with a growing number of blocks, measures loading the block set (cold, from the
+cache and memoized), a post feed page with SQL ``NOT IN`` exclusion, and the same page with
+in-loop filtering during pagination.
+
+BLOCK_STEPS=10,100,1000,5000 POSTS=20000 REPEAT=10 python scripts/bench_blocks.py
+"""
+
+from bench_utils import _env, setup_django, test_database, timed_ms
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from posts.models import Post  # noqa: E402
+from posts.views import PostListCreateView  # noqa: E402
+from social.blocks import blocked_user_ids  # noqa: E402
+from social.models import Block  # noqa: E402
+
+User = get_user_model()
+BATCH_SIZE = 5000
+
+
+def _feed_page(viewer):
+    request = APIRequestFactory().get("/api/v1/posts/", {"page_size": 20})
+    # A fresh instance per request, as the auth middleware would give us.
+    user = User.objects.get(pk=viewer.pk)
+    force_authenticate(request, user=user)
+    response = PostListCreateView.as_view()(request)
+    assert response.status_code == 200, response.data
+
+
+def main():
+    steps = [int(s) for s in _env("BLOCK_STEPS", "10,100,1000,5000").split(",")]
+    posts = int(_env("POSTS", "20000"))
+    repeat = int(_env("REPEAT", "10"))
+
+    with test_database():
+        User.objects.bulk_create(
+            (User(username=f"user{i}", password="!") for i in range(max(steps))),
+            batch_size=BATCH_SIZE,
+        )
+        author_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+        Post.objects.bulk_create(
+            (Post(author_id=author_ids[i % len(author_ids)], content="x") for i in range(posts)),
+            batch_size=BATCH_SIZE,
+        )
+
+        header = (
+            f"{'blocks':>7} | {'load cold':>10} {'load cache':>11} {'memoized':>9} | "
+            f"{'NOT IN page':>12} {'loop page':>10}"
+        )
+        print(f"{posts} posts by {len(author_ids)} authors, median of {repeat} runs")
+        print(header)
+        print("-" * len(header))
+        for count in steps:
+            viewer = User.objects.create(username=f"viewer{count}", password="!")
+            Block.objects.bulk_create(
+                (Block(blocker=viewer, blocked_id=pk) for pk in author_ids[:count]),
+                batch_size=BATCH_SIZE,
+            )
+
+            def cold():
+                cache.clear()
+                blocked_user_ids(User.objects.get(pk=viewer.pk))
+
+            cold_ms = timed_ms(cold, repeat=repeat)
+            cached_ms = timed_ms(
+                lambda: blocked_user_ids(User.objects.get(pk=viewer.pk)), repeat=repeat
+            )
+            memoized_ms = timed_ms(lambda: blocked_user_ids(viewer), repeat=repeat)
+            with override_settings(BLOCKS_SQL_EXCLUDE_LIMIT=count):
+                sql_ms = timed_ms(lambda: _feed_page(viewer), repeat=repeat)
+            with override_settings(BLOCKS_SQL_EXCLUDE_LIMIT=0):
+                loop_ms = timed_ms(lambda: _feed_page(viewer), repeat=repeat)
+            print(
+                f"{count:>7} | {cold_ms:>8.2f}ms {cached_ms:>9.2f}ms {memoized_ms:>7.3f}ms | "
+                f"{sql_ms:>10.2f}ms {loop_ms:>8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Home feed fan-out benchmark.
+
+Measures post write latency and home-timeline read latency as an author's follower count grows,
+comparing pure fan-out-on-write ("push") with the hybrid mode that skips high-follower authors
+at write time and merges their recent posts at read time.
+
+FOLLOWER_STEPS=10,100,1000,10000,100000,1000000 READS=20 python scripts/bench_feed.py
+"""
+
+from bench_utils import _env, setup_django, test_database, timed_ms
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db.models import F  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from feed.models import HighFanoutAuthor, TimelineEntry  # noqa: E402
+from feed.utils import fan_out_post, home_timeline, hydrate_posts  # noqa: E402
+from posts.models import Post  # noqa: E402
+from social.models import Follow  # noqa: E402
+
+User = get_user_model()
+BATCH_SIZE = 5000
+
+
+def _create_users(count, prefix):
+    users = [User(username=f"{prefix}{i}", password="!") for i in range(count)]
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    return list(
+        User.objects.filter(username__startswith=prefix).order_by("id").values_list("id", flat=True)
+    )
+
+
+def _follow(author, follower_ids):
+    Follow.objects.bulk_create(
+        (Follow(follower_id=pk, following=author) for pk in follower_ids), batch_size=BATCH_SIZE
+    )
+    # bulk_create skips the views' counter updates; is_high_fanout reads follower_count.
+    User.objects.filter(pk=author.pk).update(follower_count=F("follower_count") + len(follower_ids))
+
+
+def _read(reader, page_size=20):
+    keys = home_timeline(reader, limit=page_size + 1)
+    hydrate_posts(reader, [post_id for _, post_id in keys[:page_size]])
+
+
+def _run_step(mode, count, follower_ids, reader, threshold, reads):
+    author = User.objects.create(username=f"{mode}-author-{count}", password="!")
+    _follow(author, follower_ids[:count])
+    post = Post.objects.create(author=author, content="benchmark")
+    with override_settings(FEED_FANOUT_FOLLOWER_THRESHOLD=threshold):
+        write_ms = timed_ms(lambda: fan_out_post(post))
+        cache.clear()
+        cold_read_ms = timed_ms(lambda: _read(reader))
+        read_ms = timed_ms(lambda: _read(reader), repeat=reads)
+    Follow.objects.filter(following=author).delete()
+    TimelineEntry.objects.filter(author=author).delete()
+    HighFanoutAuthor.objects.filter(user=author).delete()
+    return write_ms, cold_read_ms, read_ms
+
+
+def main():
+    steps = [int(s) for s in _env("FOLLOWER_STEPS", "10,100,1000,10000,100000,1000000").split(",")]
+    reads = int(_env("READS", "20"))
+    hybrid_threshold = int(_env("HYBRID_THRESHOLD", "10000"))
+    celebrities = int(_env("FOLLOWED_CELEBRITIES", "20"))
+
+    with test_database():
+        follower_ids = _create_users(max(steps), "follower")
+        reader = User.objects.get(pk=follower_ids[0])
+
+        # Give the reader a realistic timeline plus some already-known celebrities to merge.
+        regular = User.objects.create(username="regular", password="!")
+        _follow(regular, [reader.id])
+        for i in range(200):
+            fan_out_post(Post.objects.create(author=regular, content=f"regular {i}"))
+        for pk in _create_users(celebrities, "celebrity"):
+            HighFanoutAuthor.objects.create(user_id=pk)
+            Follow.objects.create(follower=reader, following_id=pk)
+            Post.objects.bulk_create(
+                Post(author_id=pk, content=f"celebrity {i}") for i in range(50)
+            )
+
+        print(f"Hybrid threshold: {hybrid_threshold}, reader follows {celebrities} celebrities")
+        header = (
+            f"{'followers':>10} | {'push write':>11} {'push read':>10} | "
+            f"{'hybrid write':>12} {'hybrid read':>11} {'cold read':>10}"
+        )
+        print(header)
+        print("-" * len(header))
+        for count in steps:
+            push = _run_step("push", count, follower_ids, reader, count + 1, reads)
+            hybrid = _run_step("hybrid", count, follower_ids, reader, hybrid_threshold, reads)
+            print(
+                f"{count:>10} | {push[0]:>9.2f}ms {push[2]:>8.2f}ms | "
+                f"{hybrid[0]:>10.2f}ms {hybrid[2]:>9.2f}ms {hybrid[1]:>8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
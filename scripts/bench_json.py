@@ -0,0 +1,87 @@
+"""JSON renderer benchmark.
+
+Renders realistic paginated post and notification pages with DRF's ``JSONRenderer`` and with
+``FastJSONRenderer``, reporting median render time and peak traced memory per page.
+
+PAGE_SIZE=100 REPEAT=50 python scripts/bench_json.py
+"""
+
+import tracemalloc
+
+from bench_utils import _env, setup_django, test_database, timed_ms
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from core.renderers import FastJSONRenderer  # noqa: E402
+from notifications.models import Notification  # noqa: E402
+from notifications.serializers import NotificationSerializer  # noqa: E402
+from posts.models import Post  # noqa: E402
+from posts.serializers import PostSerializer  # noqa: E402
+
+User = get_user_model()
+
+
+def _page(results):
+    return {
+        "next": "http://testserver/api/v1/posts/?cursor=WzAsWzFdXQ==",
+        "previous": None,
+        "results": results,
+    }
+
+
+def _pages(page_size):
+    users = User.objects.bulk_create(User(username=f"user{i}", password="!") for i in range(20))
+    Post.objects.bulk_create(
+        Post(author=users[i % 20], content=f"Post {i} with some ünïcode text ✓ " * 8)
+        for i in range(page_size)
+    )
+    post = Post.objects.first()
+    Notification.objects.bulk_create(
+        Notification(
+            recipient=users[0],
+            actor=users[i % 20],
+            verb=Notification.Verb.COMMENTED,
+            data={"post_id": post.id, "preview": "Nice post!"},
+        )
+        for i in range(page_size)
+    )
+    posts = PostSerializer(Post.objects.order_by("-id")[:page_size], many=True).data
+    notifications = NotificationSerializer(
+        Notification.objects.select_related("actor", "content_type")[:page_size], many=True
+    ).data
+    return [("posts", _page(posts)), ("notifications", _page(notifications))]
+
+
+def _peak_kib(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    page_size = int(_env("PAGE_SIZE", "100"))
+    repeat = int(_env("REPEAT", "50"))
+    renderers = [("drf", JSONRenderer()), ("fast", FastJSONRenderer())]
+
+    with test_database():
+        pages = _pages(page_size)
+
+    print(f"Page size: {page_size}, median of {repeat} renders")
+    header = f"{'page':>14} {'renderer':>9} | {'render':>9} {'peak mem':>10} {'bytes':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, data in pages:
+        for label, renderer in renderers:
+            render_ms = timed_ms(lambda: renderer.render(data), repeat=repeat)
+            peak = _peak_kib(lambda: renderer.render(data))
+            size = len(renderer.render(data))
+            print(f"{name:>14} {label:>9} | {render_ms:>7.3f}ms {peak:>7.1f}KiB {size:>8}")
+
+
+if __name__ == "__main__":
+    main()
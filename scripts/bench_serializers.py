@@ -0,0 +1,83 @@
+"""Read-path serializer benchmark.
+
+Renders pages of posts, comments and notifications with the DRF ModelSerializers and with the
+``.values()`` fast path, reporting rows per second for query + serialization of each.
+
+PAGE_SIZE=100 ROWS=2000 REPEAT=20 python scripts/bench_serializers.py
+"""
+
+from bench_utils import _env, setup_django, test_database, timed_ms
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from notifications.models import Notification  # noqa: E402
+from notifications.serializers import (  # noqa: E402
+    NOTIFICATION_VALUES,
+    NotificationSerializer,
+)
+from posts.models import Comment, Post  # noqa: E402
+from posts.serializers import (  # noqa: E402
+    COMMENT_VALUES,
+    POST_VALUES,
+    CommentSerializer,
+    PostSerializer,
+)
+
+User = get_user_model()
+
+
+def _seed(rows):
+    users = User.objects.bulk_create(User(username=f"user{i}", password="!") for i in range(50))
+    Post.objects.bulk_create(
+        Post(author=users[i % 50], content=f"post {i} " * 20) for i in range(rows)
+    )
+    post = Post.objects.first()
+    Comment.objects.bulk_create(
+        Comment(author=users[i % 50], post=post, content=f"comment {i}") for i in range(rows)
+    )
+    Notification.objects.bulk_create(
+        Notification(
+            recipient=users[0],
+            actor=users[i % 50],
+            verb=Notification.Verb.COMMENTED,
+            data={"post_id": post.id},
+        )
+        for i in range(rows)
+    )
+
+
+def main():
+    page_size = int(_env("PAGE_SIZE", "100"))
+    rows = int(_env("ROWS", "2000"))
+    repeat = int(_env("REPEAT", "20"))
+    cases = [
+        ("posts", PostSerializer, POST_VALUES, Post.objects.order_by("-created_at", "-id")),
+        ("comments", CommentSerializer, COMMENT_VALUES, Comment.objects.order_by("created_at")),
+        (
+            "notifications",
+            NotificationSerializer,
+            NOTIFICATION_VALUES,
+            Notification.objects.order_by("-created_at", "-id"),
+        ),
+    ]
+
+    with test_database():
+        _seed(rows)
+        header = f"{'serializer':>14} | {'model rows/s':>13} {'values rows/s':>14} {'speedup':>8}"
+        print(f"Page size: {page_size}, median of {repeat} runs")
+        print(header)
+        print("-" * len(header))
+        for name, slow, fast, queryset in cases:
+            page = queryset[:page_size]
+            slow_ms = timed_ms(lambda: slow(list(page), many=True).data, repeat=repeat)
+            fast_ms = timed_ms(lambda: fast.to_representation(fast.values(page)), repeat=repeat)
+            print(
+                f"{name:>14} | {page_size / slow_ms * 1000:>13.0f} "
+                f"{page_size / fast_ms * 1000:>14.0f} {slow_ms / fast_ms:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, response, status, views
 
+from feed.utils import backfill_author, prune_author
+from social.blocks import invalidate_blocks
 from social.models import Block, Follow
 from notifications.models import Notification
 from notifications.utils import create_notification
@@ -9,6 +13,20 @@ from notifications.utils import create_notification
 User = get_user_model()
 
 
+def _adjust_follow_counts(follower_id, following_id, delta):
+    """Apply ``delta`` to the denormalized follower/following counters of one Follow edge."""
+    if delta < 0:
+        User.objects.filter(pk=follower_id, following_count__gte=-delta).update(
+            following_count=F("following_count") + delta
+        )
+        User.objects.filter(pk=following_id, follower_count__gte=-delta).update(
+            follower_count=F("follower_count") + delta
+        )
+    elif delta > 0:
+        User.objects.filter(pk=follower_id).update(following_count=F("following_count") + delta)
+        User.objects.filter(pk=following_id).update(follower_count=F("follower_count") + delta)
+
+
 class FollowView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -32,14 +50,19 @@ class FollowView(views.APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        obj, created = Follow.objects.get_or_create(follower=request.user, following=target)
-        if created and target != request.user:
-            create_notification(
-                recipient=target,
-                actor=request.user,
-                verb=Notification.Verb.FOLLOWED,
-                target=request.user,
-            )
+        with transaction.atomic():
+            obj, created = Follow.objects.get_or_create(follower=request.user, following=target)
+            if created:
+                _adjust_follow_counts(request.user.id, target.id, 1)
+                backfill_author(request.user, target.id)
+            if created and target != request.user:
+                create_notification(
+                    recipient=target,
+                    actor=request.user,
+                    verb=Notification.Verb.FOLLOWED,
+                    target=request.user,
+                    group_key="followers",
+                )
         return response.Response(
             {"detail": "Followed."},
             status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
@@ -47,7 +70,9 @@ class FollowView(views.APIView):
 
     def delete(self, request, user_id):
         target = get_object_or_404(User, pk=user_id)
-        Follow.objects.filter(follower=request.user, following=target).delete()
+        deleted, _ = Follow.objects.filter(follower=request.user, following=target).delete()
+        _adjust_follow_counts(request.user.id, target.id, -deleted)
+        prune_author(request.user.id, target.id)
         return response.Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -62,12 +87,20 @@ class BlockView(views.APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        Block.objects.get_or_create(blocker=request.user, blocked=target)
-        Follow.objects.filter(follower=request.user, following=target).delete()
-        Follow.objects.filter(follower=target, following=request.user).delete()
+        _, created = Block.objects.get_or_create(blocker=request.user, blocked=target)
+        if created:
+            invalidate_blocks(request.user.id, target.id)
+        deleted, _ = Follow.objects.filter(follower=request.user, following=target).delete()
+        _adjust_follow_counts(request.user.id, target.id, -deleted)
+        deleted, _ = Follow.objects.filter(follower=target, following=request.user).delete()
+        _adjust_follow_counts(target.id, request.user.id, -deleted)
+        prune_author(request.user.id, target.id)
+        prune_author(target.id, request.user.id)
         return response.Response({"detail": "Blocked."}, status=status.HTTP_201_CREATED)
 
     def delete(self, request, user_id):
         target = get_object_or_404(User, pk=user_id)
-        Block.objects.filter(blocker=request.user, blocked=target).delete()
+        deleted, _ = Block.objects.filter(blocker=request.user, blocked=target).delete()
+        if deleted:
+            invalidate_blocks(request.user.id, target.id)
         return response.Response(status=status.HTTP_204_NO_CONTENT)
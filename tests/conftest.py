@@ -1,8 +1,16 @@
 import pytest
 
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 
 @pytest.fixture()
 def api_client():
     return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
@@ -1,6 +1,8 @@
 import pytest
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from tests.utils import authenticate_client, set_csrf_cookie
 
@@ -131,3 +133,42 @@ def test_me_update_display_name(api_client):
 
     assert response.status_code == 200
     assert response.json()["display_name"] == "Updated"
+
+
+@pytest.mark.django_db
+def test_authenticated_user_is_cached_until_changed(api_client, django_capture_on_commit_callbacks):
+    user = User.objects.create_user(username="cached", password="S3curePassw0rd!")
+    authenticate_client(api_client, user)
+    api_client.get("/api/v1/notifications/unread-count/")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/v1/notifications/unread-count/")
+    assert response.status_code == 200
+    assert not any("users_user" in query["sql"] for query in queries)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.patch("/api/v1/users/me/", {"display_name": "Renamed"}, format="json")
+    assert response.status_code == 200
+    assert api_client.get("/api/v1/users/me/").json()["display_name"] == "Renamed"
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        # Until the deactivation commits, the cached (still active) entry stays valid.
+        assert api_client.get("/api/v1/notifications/unread-count/").status_code == 200
+    assert callbacks
+    assert api_client.get("/api/v1/notifications/unread-count/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_me_endpoint_loads_the_user_in_one_query(api_client):
+    user = User.objects.create_user(
+        username="meonce", email="me@example.com", password="S3curePassw0rd!"
+    )
+    authenticate_client(api_client, user)
+    api_client.get("/api/v1/users/me/")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/v1/users/me/")
+    assert response.json()["email"] == "me@example.com"
+    assert len(queries) == 1
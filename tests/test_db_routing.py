@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from core.db import PrimaryReplicaRouter, replica_reads
+from core.middleware import PIN_COOKIE_NAME, ReplicaRoutingMiddleware
+from groups.access import visible_group_ids
+from groups.models import Group, Membership
+from notifications.cache import unread_count
+from posts.models import Post
+from social.blocks import blocked_user_ids
+from social.models import Block
+from users.cache import get_auth_user
+
+User = get_user_model()
+
+router = PrimaryReplicaRouter()
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+def test_router_reads_from_replica_only_when_allowed():
+    assert router.db_for_read(Post) == "default"
+    with replica_reads():
+        assert router.db_for_read(Post) == "replica1"
+        assert router.db_for_write(Post) == "default"
+        with replica_reads(False):
+            assert router.db_for_read(Post) == "default"
+    assert router.allow_migrate("replica1", "posts") is False
+    assert router.allow_migrate("default", "posts") is True
+
+
+@override_settings(DATABASE_REPLICAS=[])
+def test_router_without_replicas_uses_primary():
+    with replica_reads():
+        assert router.db_for_read(Post) == "default"
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], DB_REPLICA_PIN_SECONDS=5)
+def test_middleware_pins_writers_to_primary():
+    seen = []
+
+    def view(request):
+        seen.append(router.db_for_read(Post))
+        return HttpResponse(status=201 if request.method == "POST" else 200)
+
+    middleware = ReplicaRoutingMiddleware(view)
+    factory = RequestFactory()
+
+    assert PIN_COOKIE_NAME not in middleware(factory.get("/")).cookies
+    response = middleware(factory.post("/"))
+    pin = response.cookies[PIN_COOKIE_NAME]
+    assert pin["max-age"] == 5
+
+    pinned = factory.get("/")
+    pinned.COOKIES[PIN_COOKIE_NAME] = pin.value
+    middleware(pinned)
+    expired = factory.get("/")
+    expired.COOKIES[PIN_COOKIE_NAME] = str(int(time.time()) - 1)
+    middleware(expired)
+    assert seen == ["replica1", "default", "default", "replica1"]
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(DATABASE_REPLICAS=["replica1"])
+def test_shared_caches_are_filled_from_the_primary():
+    # "replica1" is not a configured database, so any cache fill routed there would raise.
+    user = User.objects.create_user(username="primary", password="S3curePassw0rd!")
+    other = User.objects.create_user(username="other", password="S3curePassw0rd!")
+    group = Group.objects.create(name="Fresh", slug="fresh", created_by=other)
+    Membership.objects.create(user=user, group=group)
+    Block.objects.create(blocker=other, blocked=user)
+
+    with replica_reads():
+        assert router.db_for_read(Post) == "replica1"
+        assert visible_group_ids(user) == {group.id}
+        assert list(blocked_user_ids(user)) == [other.id]
+        assert unread_count(user.id) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(DATABASE_REPLICAS=["replica1"])
+def test_auth_user_cache_is_filled_from_the_primary():
+    user = User.objects.create_user(username="authprimary", password="S3curePassw0rd!")
+    with replica_reads():
+        assert get_auth_user(user.id).username == "authprimary"
@@ -0,0 +1,137 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+
+from feed.models import HighFanoutAuthor, TimelineEntry
+from groups.models import Group, Membership
+from posts.models import Post
+from social.models import Follow
+from tests.utils import authenticate_client
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_post_fans_out_to_followers(api_client):
+    author = User.objects.create_user(username="author", password="S3curePassw0rd!")
+    follower = User.objects.create_user(username="follower", password="S3curePassw0rd!")
+    stranger = User.objects.create_user(username="stranger", password="S3curePassw0rd!")
+    Follow.objects.create(follower=follower, following=author)
+
+    authenticate_client(api_client, author)
+    response = api_client.post("/api/v1/posts/", {"content": "Hello followers"}, format="json")
+    assert response.status_code == 201
+    post_id = response.json()["id"]
+
+    assert TimelineEntry.objects.filter(owner=follower, post_id=post_id).exists()
+    assert TimelineEntry.objects.filter(owner=author, post_id=post_id).exists()
+    assert not TimelineEntry.objects.filter(owner=stranger).exists()
+
+    authenticate_client(api_client, follower)
+    response = api_client.get("/api/v1/feed/home/")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [post_id]
+
+
+@pytest.mark.django_db
+def test_home_feed_requires_auth(api_client):
+    response = api_client.get("/api/v1/feed/home/")
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_follow_backfills_and_unfollow_prunes(api_client):
+    author = User.objects.create_user(username="author2", password="S3curePassw0rd!")
+    follower = User.objects.create_user(username="follower2", password="S3curePassw0rd!")
+    older = Post.objects.create(author=author, content="Before follow")
+
+    authenticate_client(api_client, follower)
+    response = api_client.post(f"/api/v1/users/{author.id}/follow/")
+    assert response.status_code == 201
+    assert TimelineEntry.objects.filter(owner=follower, post=older).exists()
+
+    response = api_client.delete(f"/api/v1/users/{author.id}/follow/")
+    assert response.status_code == 204
+    assert not TimelineEntry.objects.filter(owner=follower, author=author).exists()
+
+
+@pytest.mark.django_db
+def test_block_prunes_both_timelines(api_client):
+    alice = User.objects.create_user(username="alice", password="S3curePassw0rd!")
+    bob = User.objects.create_user(username="bob", password="S3curePassw0rd!")
+    Follow.objects.create(follower=alice, following=bob)
+    Follow.objects.create(follower=bob, following=alice)
+
+    authenticate_client(api_client, alice)
+    api_client.post("/api/v1/posts/", {"content": "From alice"}, format="json")
+    authenticate_client(api_client, bob)
+    api_client.post("/api/v1/posts/", {"content": "From bob"}, format="json")
+    assert TimelineEntry.objects.filter(owner=alice, author=bob).exists()
+    assert TimelineEntry.objects.filter(owner=bob, author=alice).exists()
+
+    response = api_client.post(f"/api/v1/users/{alice.id}/block/")
+    assert response.status_code == 201
+    assert not TimelineEntry.objects.filter(owner=alice, author=bob).exists()
+    assert not TimelineEntry.objects.filter(owner=bob, author=alice).exists()
+
+
+@pytest.mark.django_db
+def test_private_group_post_skips_non_member_followers(api_client):
+    author = User.objects.create_user(username="author3", password="S3curePassw0rd!")
+    member = User.objects.create_user(username="member3", password="S3curePassw0rd!")
+    outsider = User.objects.create_user(username="outsider3", password="S3curePassw0rd!")
+    group = Group.objects.create(
+        name="Secret",
+        slug="secret",
+        created_by=author,
+        visibility=Group.Visibility.PRIVATE,
+    )
+    Membership.objects.create(user=author, group=group, role=Membership.Role.OWNER)
+    Membership.objects.create(user=member, group=group)
+    Follow.objects.create(follower=member, following=author)
+    Follow.objects.create(follower=outsider, following=author)
+
+    authenticate_client(api_client, author)
+    response = api_client.post(
+        "/api/v1/posts/", {"content": "Members only", "group": group.id}, format="json"
+    )
+    assert response.status_code == 201
+
+    assert TimelineEntry.objects.filter(owner=member).exists()
+    assert not TimelineEntry.objects.filter(owner=outsider).exists()
+
+
+@pytest.mark.django_db
+@override_settings(FEED_FANOUT_FOLLOWER_THRESHOLD=2)
+def test_high_fanout_author_merged_at_read_time(api_client):
+    celebrity = User.objects.create_user(username="celebrity", password="S3curePassw0rd!")
+    regular = User.objects.create_user(username="regular", password="S3curePassw0rd!")
+    reader = User.objects.create_user(username="reader", password="S3curePassw0rd!")
+    other = User.objects.create_user(username="other", password="S3curePassw0rd!")
+    Follow.objects.create(follower=reader, following=celebrity)
+    Follow.objects.create(follower=other, following=celebrity)
+    Follow.objects.create(follower=reader, following=regular)
+    call_command("repair_counters", stdout=StringIO())
+
+    post_ids = []
+    for author, content in [(regular, "one"), (celebrity, "two"), (regular, "three")]:
+        authenticate_client(api_client, author)
+        response = api_client.post("/api/v1/posts/", {"content": content}, format="json")
+        post_ids.append(response.json()["id"])
+
+    assert HighFanoutAuthor.objects.filter(user=celebrity).exists()
+    assert not TimelineEntry.objects.filter(owner=reader, author=celebrity).exists()
+
+    authenticate_client(api_client, reader)
+    response = api_client.get("/api/v1/feed/home/?page_size=2")
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["results"]] == post_ids[:0:-1]
+
+    response = api_client.get(body["next"])
+    body = response.json()
+    assert [item["id"] for item in body["results"]] == post_ids[:1]
+    assert body["next"] is None
@@ -1,9 +1,15 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from tests.utils import authenticate_client
 
+from groups.access import visible_group_ids
 from groups.models import Group, Membership
+from notifications.models import Notification
+from posts.models import Post
 
 User = get_user_model()
 
@@ -110,3 +116,159 @@ def test_private_group_members_requires_membership(api_client):
     response = api_client.get(f"/api/v1/groups/{group.id}/members/")
 
     assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_member_count_tracks_create_join_and_approve(api_client):
+    User.objects.create_user(username="owner6", password="S3curePassw0rd!")
+    _login(api_client, "owner6", "S3curePassw0rd!")
+    response = api_client.post(
+        "/api/v1/groups/",
+        {"name": "Counted", "join_policy": "request"},
+        format="json",
+    )
+    group = Group.objects.get(pk=response.json()["id"])
+    assert response.json()["member_count"] == 1
+
+    joiner = User.objects.create_user(username="joiner6", password="S3curePassw0rd!")
+    _login(api_client, "joiner6", "S3curePassw0rd!")
+    api_client.post(f"/api/v1/groups/{group.id}/join/")
+    group.refresh_from_db()
+    assert group.member_count == 1
+
+    _login(api_client, "owner6", "S3curePassw0rd!")
+    api_client.post(f"/api/v1/groups/{group.id}/members/{joiner.id}/approve/")
+    group.refresh_from_db()
+    assert group.member_count == 2
+
+
+@pytest.mark.django_db
+def test_group_directory_sorts_public_groups(api_client):
+    owner = User.objects.create_user(username="dirowner", password="S3curePassw0rd!")
+    busy = Group.objects.create(name="Busy", slug="busy", created_by=owner, member_count=5)
+    quiet = Group.objects.create(name="Quiet", slug="quiet", created_by=owner, member_count=1)
+    Group.objects.create(
+        name="Hidden",
+        slug="hidden",
+        created_by=owner,
+        member_count=9,
+        visibility=Group.Visibility.PRIVATE,
+    )
+    Membership.objects.create(user=owner, group=quiet, role=Membership.Role.OWNER)
+
+    body = api_client.get("/api/v1/groups/?page_size=1").json()
+    assert [g["id"] for g in body["results"]] == [busy.id]
+    body = api_client.get(body["next"]).json()
+    assert [g["id"] for g in body["results"]] == [quiet.id]
+    assert body["next"] is None
+
+    names = [g["name"] for g in api_client.get("/api/v1/groups/?sort=name").json()["results"]]
+    assert names == ["Busy", "Quiet"]
+
+    _login(api_client, "dirowner", "S3curePassw0rd!")
+    post = api_client.post(
+        "/api/v1/posts/", {"content": "Wake up", "group": quiet.id}, format="json"
+    ).json()
+    quiet.refresh_from_db()
+    assert quiet.last_post_at == Post.objects.get(pk=post["id"]).created_at
+    ordered = api_client.get("/api/v1/groups/?sort=active").json()["results"]
+    assert [g["id"] for g in ordered] == [quiet.id, busy.id]
+
+
+@pytest.mark.django_db
+def test_member_listing_paginates_filters_and_hides_pending_queue(api_client):
+    owner = User.objects.create_user(username="listowner", password="S3curePassw0rd!")
+    group = Group.objects.create(
+        name="Listed",
+        slug="listed",
+        created_by=owner,
+        join_policy=Group.JoinPolicy.REQUEST,
+    )
+    Membership.objects.create(user=owner, group=group, role=Membership.Role.OWNER)
+    members = [
+        User.objects.create_user(username=f"listmember{i}", password="S3curePassw0rd!")
+        for i in range(3)
+    ]
+    for member in members:
+        Membership.objects.create(user=member, group=group)
+    waiting = User.objects.create_user(username="listwaiting", password="S3curePassw0rd!")
+    Membership.objects.create(user=waiting, group=group, status=Membership.Status.PENDING)
+
+    _login(api_client, "listmember0", "S3curePassw0rd!")
+    body = api_client.get(f"/api/v1/groups/{group.id}/members/?page_size=2").json()
+    assert [m["user"] for m in body["results"]] == [owner.id, members[0].id]
+    body = api_client.get(body["next"]).json()
+    assert [m["user"] for m in body["results"]] == [members[1].id, members[2].id]
+    assert body["next"] is None
+
+    owners = api_client.get(f"/api/v1/groups/{group.id}/members/?role=owner").json()
+    assert [m["user"] for m in owners["results"]] == [owner.id]
+    response = api_client.get(f"/api/v1/groups/{group.id}/members/?role=admin")
+    assert response.status_code == 400
+
+    response = api_client.get(f"/api/v1/groups/{group.id}/members/pending/")
+    assert response.status_code == 403
+
+    _login(api_client, "listowner", "S3curePassw0rd!")
+    response = api_client.get(f"/api/v1/groups/{group.id}/members/pending/")
+    assert response.status_code == 200
+    assert [m["user"] for m in response.json()["results"]] == [waiting.id]
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get(f"/api/v1/groups/{group.id}/members/")
+    membership_queries = [q for q in queries if "groups_membership" in q["sql"]]
+    assert len(membership_queries) == 1
+
+
+@pytest.mark.django_db
+def test_bulk_review_approves_and_rejects_pending_requests(api_client):
+    owner = User.objects.create_user(username="reviewowner", password="S3curePassw0rd!")
+    group = Group.objects.create(
+        name="Reviewed",
+        slug="reviewed",
+        created_by=owner,
+        join_policy=Group.JoinPolicy.REQUEST,
+        member_count=1,
+    )
+    Membership.objects.create(user=owner, group=group, role=Membership.Role.OWNER)
+    waiting = [
+        User.objects.create_user(username=f"reviewwait{i}", password="S3curePassw0rd!")
+        for i in range(4)
+    ]
+    for user in waiting:
+        Membership.objects.create(user=user, group=group, status=Membership.Status.PENDING)
+    url = f"/api/v1/groups/{group.id}/members/review/"
+
+    assert group.id not in visible_group_ids(waiting[0])
+    _login(api_client, "reviewwait0", "S3curePassw0rd!")
+    response = api_client.post(url, {"action": "approve", "user_ids": [waiting[0].id]})
+    assert response.status_code == 403
+
+    _login(api_client, "reviewowner", "S3curePassw0rd!")
+    response = api_client.post(url, {"action": "approve"}, format="json")
+    assert response.status_code == 400
+
+    response = api_client.post(
+        url,
+        {"action": "approve", "user_ids": [waiting[0].id, waiting[1].id, owner.id]},
+        format="json",
+    )
+    assert response.json() == {"approved": 2, "more": False}
+    group.refresh_from_db()
+    assert group.member_count == 3
+    assert (
+        Notification.objects.filter(
+            verb=Notification.Verb.GROUP_APPROVED, recipient__in=waiting[:2]
+        ).count()
+        == 2
+    )
+
+    assert group.id in visible_group_ids(User.objects.get(pk=waiting[0].id))
+
+    response = api_client.post(
+        url, {"action": "reject", "before": timezone.now().isoformat()}, format="json"
+    )
+    assert response.json() == {"rejected": 2, "more": False}
+    assert not Membership.objects.filter(group=group, status=Membership.Status.PENDING).exists()
+    group.refresh_from_db()
+    assert group.member_count == 3
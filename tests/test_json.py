@@ -0,0 +1,49 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+from django.utils.functional import lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import parsers, renderers
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+SAMPLE = {
+    "id": 7,
+    "content": "snow ☃ and a line\u2028separator",
+    "created_at": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+    "local": datetime.datetime(
+        2024, 5, 1, 8, 30, 0, 125, tzinfo=datetime.timezone(datetime.timedelta(hours=-4))
+    ),
+    "day": datetime.date(2024, 5, 1),
+    "price": Decimal("1.50"),
+    "label": lazy(lambda: "lazy", str)(),
+    "ids": (1, 2, 3),
+    1: None,
+    "nested": [{"ok": True, "ratio": 0.25}],
+}
+
+
+def test_fast_renderer_matches_drf_renderer():
+    assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+    assert FastJSONRenderer().render(None) == b""
+    indented = "application/json; indent=4"
+    assert FastJSONRenderer().render(SAMPLE, indented) == JSONRenderer().render(SAMPLE, indented)
+
+
+def test_fast_parser_matches_drf_parser():
+    body = '{"content": "snow ☃", "ids": [1, 2.5, null], "ok": true}'.encode("utf-8")
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"value": NaN}'))
+
+
+def test_renderer_and_parser_fall_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+    monkeypatch.setattr(parsers, "orjson", None)
+    assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+    assert FastJSONParser().parse(io.BytesIO(b'{"a": [1]}')) == {"a": [1]}
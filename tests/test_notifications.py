@@ -1,10 +1,31 @@
+import asyncio
+import json
+from datetime import timedelta
+from io import StringIO
+
 import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
+import notifications.cache as unread_cache
 from groups.models import Group, Membership
-from notifications.models import Notification
+from notifications import broker, reads
+from notifications.checks import outbox_needs_redis
+from notifications.models import Notification, NotificationEvent
+from notifications.utils import (
+    aggregate_notification,
+    aggregation_window,
+    bulk_create_notifications,
+    create_notification,
+)
 from posts.models import Comment, Post
-from tests.utils import authenticate_client
+from tests.utils import access_token_for_user, authenticate_client
 
 User = get_user_model()
 
@@ -151,3 +172,390 @@ def test_notifications_cursor_pagination(api_client):
     response = api_client.get("/api/v1/notifications/?pagination=cursor")
     assert response.status_code == 200
     assert "results" in response.json()
+
+
+@pytest.mark.django_db
+def test_notifications_conditional_get(api_client):
+    actor = User.objects.create_user(username="actor6", password="S3curePassw0rd!")
+    recipient = User.objects.create_user(username="recipient6", password="S3curePassw0rd!")
+    notification = Notification.objects.create(
+        recipient=recipient, actor=actor, verb=Notification.Verb.FOLLOWED
+    )
+    authenticate_client(api_client, recipient)
+
+    etag = api_client.get("/api/v1/notifications/")["ETag"]
+    response = api_client.get("/api/v1/notifications/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+    api_client.patch(f"/api/v1/notifications/{notification.id}/read/")
+    response = api_client.get("/api/v1/notifications/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["is_read"] is True
+
+
+@pytest.mark.django_db
+@override_settings(NOTIFICATIONS_OUTBOX=True)
+def test_outbox_defers_notifications_until_drained(api_client):
+    author = User.objects.create_user(username="outboxauthor", password="S3curePassw0rd!")
+    fans = [
+        User.objects.create_user(username=f"outboxfan{i}", password="S3curePassw0rd!")
+        for i in range(3)
+    ]
+    post = Post.objects.create(author=author, content="Queued")
+    for fan in fans:
+        authenticate_client(api_client, fan)
+        assert api_client.post(f"/api/v1/users/{author.id}/follow/").status_code == 201
+    authenticate_client(api_client, fans[0])
+    response = api_client.post(
+        f"/api/v1/posts/{post.id}/comments/", {"content": "Nice"}, format="json"
+    )
+    assert response.status_code == 201
+
+    gone = User.objects.create_user(username="outboxgone", password="S3curePassw0rd!")
+    authenticate_client(api_client, author)
+    assert api_client.post(f"/api/v1/users/{gone.id}/follow/").status_code == 201
+
+    assert not Notification.objects.exists()
+    assert NotificationEvent.objects.count() == 5
+    gone.delete()
+    fans[2].delete()
+
+    out = StringIO()
+    call_command("drain_notifications", "--batch-size", "2", stdout=out)
+    assert "processed 5 events" in out.getvalue()
+    assert not NotificationEvent.objects.exists()
+    notifications = list(Notification.objects.order_by("created_at", "id"))
+    assert [(n.verb, n.actor_count) for n in notifications] == [
+        (Notification.Verb.FOLLOWED, 2),
+        (Notification.Verb.FOLLOWED, 1),
+        (Notification.Verb.COMMENTED, 1),
+    ]
+    assert {n.recipient_id for n in notifications} == {author.id}
+    assert [a["username"] for a in notifications[0].sample_actors] == ["outboxfan1", "outboxfan0"]
+    assert notifications[1].actor is None
+    assert notifications[2].target.post_id == post.id
+
+
+@pytest.mark.django_db
+def test_event_drained_after_read_all_stays_unread(api_client):
+    reader = User.objects.create_user(username="lagreader", password="S3curePassw0rd!")
+    early = User.objects.create_user(username="lagearly", password="S3curePassw0rd!")
+    late = User.objects.create_user(username="laglate", password="S3curePassw0rd!")
+    with override_settings(NOTIFICATIONS_OUTBOX=True):
+        authenticate_client(api_client, late)
+        api_client.post(f"/api/v1/users/{reader.id}/follow/")
+    # Happened after the queued event, but delivered directly while the drain lags behind.
+    create_notification(reader, Notification.Verb.GROUP_APPROVED, actor=early)
+
+    authenticate_client(api_client, reader)
+    api_client.post("/api/v1/notifications/read-all/")
+    call_command("drain_notifications", stdout=StringIO())
+
+    results = api_client.get("/api/v1/notifications/").json()["results"]
+    assert [(item["actor_username"], item["is_read"]) for item in results] == [
+        ("lagearly", True),
+        ("laglate", False),
+    ]
+    unread = api_client.get("/api/v1/notifications/?unread=1").json()["results"]
+    assert [item["actor_username"] for item in unread] == ["laglate"]
+    assert api_client.get("/api/v1/notifications/unread-count/").json() == {"unread": 1}
+
+
+@pytest.mark.django_db
+def test_comment_notifications_aggregate_per_post(api_client):
+    author = User.objects.create_user(username="aggauthor", password="S3curePassw0rd!")
+    commenters = [
+        User.objects.create_user(username=f"aggcommenter{i}", password="S3curePassw0rd!")
+        for i in range(4)
+    ]
+    post = Post.objects.create(author=author, content="Popular")
+    other = Post.objects.create(author=author, content="Quiet")
+    for commenter in [*commenters, commenters[3]]:
+        authenticate_client(api_client, commenter)
+        api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "Hi"}, format="json")
+    api_client.post(f"/api/v1/posts/{other.id}/comments/", {"content": "Hi"}, format="json")
+
+    authenticate_client(api_client, author)
+    first = api_client.get("/api/v1/notifications/")
+    results = first.json()["results"]
+    assert [item["data"]["post_id"] for item in results] == [other.id, post.id]
+    aggregate = results[1]
+    assert aggregate["actor_count"] == 4
+    assert aggregate["actor_username"] == "aggcommenter3"
+    assert [a["username"] for a in aggregate["sample_actors"]] == [
+        "aggcommenter3",
+        "aggcommenter2",
+        "aggcommenter1",
+    ]
+
+    api_client.patch(f"/api/v1/notifications/{aggregate['id']}/read/")
+    authenticate_client(api_client, commenters[1])
+    api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "Again"}, format="json")
+    authenticate_client(api_client, author)
+    response = api_client.get("/api/v1/notifications/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 200
+    top = response.json()["results"][0]
+    assert (top["id"], top["actor_count"], top["is_read"]) == (aggregate["id"], 4, False)
+    assert top["sample_actors"][0]["username"] == "aggcommenter1"
+    assert Notification.objects.filter(recipient=author).count() == 2
+
+
+@pytest.mark.django_db
+def test_etag_changes_when_an_older_event_folds_into_an_aggregate(api_client):
+    reader = User.objects.create_user(username="etagreader", password="S3curePassw0rd!")
+    fans = [
+        User.objects.create_user(username=f"etagfan{i}", password="S3curePassw0rd!")
+        for i in range(2)
+    ]
+    at = aggregation_window(timezone.now()) + timedelta(seconds=60)
+
+    def fold(fan, at):
+        aggregate_notification(
+            reader.id,
+            Notification.Verb.FOLLOWED,
+            "followers",
+            [{"id": fan.id, "username": fan.username}],
+            at=at,
+        )
+
+    fold(fans[0], at)
+    authenticate_client(api_client, reader)
+    etag = api_client.get("/api/v1/notifications/")["ETag"]
+    # A lagging drain delivers an event that happened before the aggregate's created_at.
+    fold(fans[1], at - timedelta(seconds=30))
+    response = api_client.get("/api/v1/notifications/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["actor_count"] == 2
+
+
+@pytest.mark.django_db
+def test_aggregate_counts_repeat_actor_outside_sample_once(api_client):
+    author = User.objects.create_user(username="repeatauthor", password="S3curePassw0rd!")
+    commenters = [
+        User.objects.create_user(username=f"repeater{i}", password="S3curePassw0rd!")
+        for i in range(4)
+    ]
+    post = Post.objects.create(author=author, content="Busy")
+    # repeater0 has dropped out of the three-actor sample before commenting again.
+    for commenter in [*commenters, commenters[0]]:
+        authenticate_client(api_client, commenter)
+        api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "Hi"}, format="json")
+
+    aggregate = Notification.objects.get(recipient=author)
+    assert aggregate.actor_count == 4
+    assert aggregate.aggregate_actors.count() == 4
+    assert [a["username"] for a in aggregate.sample_actors] == [
+        "repeater0",
+        "repeater3",
+        "repeater2",
+    ]
+
+
+@pytest.mark.django_db
+def test_unread_count_is_served_from_cached_counter(api_client):
+    reader = User.objects.create_user(username="badgereader", password="S3curePassw0rd!")
+    fans = [
+        User.objects.create_user(username=f"badgefan{i}", password="S3curePassw0rd!")
+        for i in range(2)
+    ]
+    post = Post.objects.create(author=reader, content="Badge")
+    authenticate_client(api_client, reader)
+    assert api_client.get("/api/v1/notifications/unread-count/").json() == {"unread": 0}
+
+    for fan in fans:
+        authenticate_client(api_client, fan)
+        api_client.post(f"/api/v1/users/{reader.id}/follow/")
+        api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "Hi"}, format="json")
+
+    authenticate_client(api_client, reader)
+    with CaptureQueriesContext(connection) as queries:
+        assert api_client.get("/api/v1/notifications/unread-count/").json() == {"unread": 2}
+    assert not any("notifications_notification" in query["sql"] for query in queries)
+
+    notification = Notification.objects.filter(recipient=reader).first()
+    api_client.patch(f"/api/v1/notifications/{notification.id}/read/")
+    assert api_client.get("/api/v1/notifications/unread-count/").json() == {"unread": 1}
+    authenticate_client(api_client, fans[0])
+    api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "More"}, format="json")
+    authenticate_client(api_client, reader)
+    assert api_client.get("/api/v1/notifications/unread-count/").json() == {"unread": 2}
+    api_client.post("/api/v1/notifications/read-all/")
+    assert api_client.get("/api/v1/notifications/unread-count/").json() == {"unread": 0}
+
+
+@pytest.mark.django_db
+def test_unread_rebuild_is_not_cached_over_a_concurrent_adjustment(monkeypatch):
+    reader = User.objects.create_user(username="racereader", password="S3curePassw0rd!")
+    fan = User.objects.create_user(username="racefan", password="S3curePassw0rd!")
+    real_read_state = unread_cache.read_state
+
+    def read_state_racing_a_notification(user_id):
+        # Another transaction bumps the counter while this rebuild counts, and commits its row
+        # only after the COUNT has run.
+        unread_cache.adjust_unread({user_id: 1})
+        return real_read_state(user_id)
+
+    monkeypatch.setattr(unread_cache, "read_state", read_state_racing_a_notification)
+    assert unread_cache.unread_count(reader.id) == 0
+    monkeypatch.setattr(unread_cache, "read_state", real_read_state)
+    Notification.objects.create(recipient=reader, actor=fan, verb=Notification.Verb.FOLLOWED)
+    assert unread_cache.unread_count(reader.id) == 1
+    create_notification(reader, Notification.Verb.FOLLOWED, actor=fan)
+    assert unread_cache.unread_count(reader.id) == 2
+
+    unread_cache.reset_unread(reader.id, 40)
+    out = StringIO()
+    call_command("reconcile_unread", stdout=out)
+    assert "dropped 1 counters" in out.getvalue()
+    assert unread_cache.unread_count(reader.id) == 2
+
+
+@pytest.mark.django_db
+def test_notification_targets_hydrate_with_constant_queries(api_client):
+    reader = User.objects.create_user(
+        username="hydrated", password="S3curePassw0rd!", display_name="Hydrated"
+    )
+    group = Group.objects.create(name="Targets", slug="targets", created_by=reader)
+    post = Post.objects.create(author=reader, content="x" * 200)
+
+    def add_batch():
+        fan = User.objects.create_user(
+            username=f"targetfan{Notification.objects.count()}", password="S3curePassw0rd!"
+        )
+        comment = Comment.objects.create(author=fan, post=post, content="Nice one")
+        for verb, target in [
+            (Notification.Verb.FOLLOWED, fan),
+            (Notification.Verb.COMMENTED, comment),
+            (Notification.Verb.GROUP_APPROVED, group),
+        ]:
+            Notification.objects.create(recipient=reader, actor=fan, verb=verb, target=target)
+        return fan, comment
+
+    fan, comment = add_batch()
+    authenticate_client(api_client, reader)
+    api_client.get("/api/v1/notifications/")
+    with CaptureQueriesContext(connection) as first:
+        results = api_client.get("/api/v1/notifications/").json()["results"]
+    targets = {item["verb"]: item["target"] for item in results}
+    assert targets == {
+        Notification.Verb.FOLLOWED: {"id": fan.id, "username": fan.username, "display_name": ""},
+        Notification.Verb.COMMENTED: {"id": comment.id, "post_id": post.id, "snippet": "Nice one"},
+        Notification.Verb.GROUP_APPROVED: {"id": group.id, "name": "Targets", "slug": "targets"},
+    }
+
+    for _ in range(5):
+        add_batch()
+    with CaptureQueriesContext(connection) as second:
+        assert len(api_client.get("/api/v1/notifications/").json()["results"]) == 18
+    assert len(second) == len(first)
+
+
+@pytest.mark.django_db
+def test_read_state_watermark_and_sparse_reads(api_client, monkeypatch):
+    monkeypatch.setattr(reads, "MAX_READ_IDS", 2)
+    reader = User.objects.create_user(username="watermark", password="S3curePassw0rd!")
+    old = [
+        Notification.objects.create(recipient=reader, verb=Notification.Verb.FOLLOWED)
+        for _ in range(3)
+    ]
+    authenticate_client(api_client, reader)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post("/api/v1/notifications/read-all/")
+    assert response.json() == {"updated": 3}
+    assert not any(
+        query["sql"].startswith("UPDATE") and "notifications_notification" in query["sql"]
+        for query in queries
+    )
+    assert not Notification.objects.filter(is_read=True).exists()
+
+    new = [create_notification(reader, Notification.Verb.FOLLOWED) for _ in range(4)]
+    body = api_client.get("/api/v1/notifications/").json()
+    flags = {item["id"]: item["is_read"] for item in body["results"]}
+    assert flags == {**{n.id: True for n in old}, **{n.id: False for n in new}}
+
+    for notification in new[:3]:
+        response = api_client.patch(f"/api/v1/notifications/{notification.id}/read/")
+        assert response.json()["is_read"] is True
+    # The third tap overflows the sparse set, which keeps its newest half and spills the rest.
+    spilled = Notification.objects.filter(is_read=True).order_by("id").values_list("id", flat=True)
+    assert list(spilled) == [new[0].id, new[1].id]
+    assert reads.read_state(reader.id).read_ids == [new[2].id]
+    unread = api_client.get("/api/v1/notifications/?unread=1").json()["results"]
+    assert [item["id"] for item in unread] == [new[3].id]
+    assert api_client.get("/api/v1/notifications/unread-count/").json() == {"unread": 1}
+
+
+# Stream DB calls run on pooled threads with their own connections, so rows must be committed.
+@pytest.mark.django_db(transaction=True)
+def test_notification_stream_pushes_new_notifications(
+    api_client, django_capture_on_commit_callbacks
+):
+    reader = User.objects.create_user(username="streamer", password="S3curePassw0rd!")
+    fan = User.objects.create_user(username="streamfan", password="S3curePassw0rd!")
+    authenticate_client(api_client, reader)
+    assert api_client.get("/api/v1/notifications/stream/").status_code == 501
+
+    client = AsyncClient()
+    assert async_to_sync(client.get)("/api/v1/notifications/stream/").status_code == 401
+    client.cookies[settings.JWT_ACCESS_COOKIE_NAME] = access_token_for_user(reader)
+
+    def notify():
+        with django_capture_on_commit_callbacks(execute=True):
+            return create_notification(
+                reader, Notification.Verb.FOLLOWED, actor=fan, target=fan, group_key="followers"
+            )
+
+    async def scenario():
+        response = await client.get("/api/v1/notifications/stream/")
+        assert response["Content-Type"] == "text/event-stream"
+        events = aiter(response.streaming_content)
+        received = [await anext(events)]
+        notification = await sync_to_async(notify)()
+        for _ in range(2):
+            received.append(await asyncio.wait_for(anext(events), timeout=5))
+        await events.aclose()
+        return notification, [chunk.decode() for chunk in received]
+
+    notification, received = async_to_sync(scenario)()
+    assert received[0] == 'retry: 5000\nevent: unread\ndata: {"unread":0}\n\n'
+    event, data = received[1].split("\n")[:2]
+    assert event == "event: notification"
+    pushed = json.loads(data.removeprefix("data: "))
+    assert (pushed["id"], pushed["actor_username"], pushed["is_read"]) == (
+        notification.id,
+        "streamfan",
+        False,
+    )
+    assert received[2] == 'event: unread\ndata: {"unread":1}\n\n'
+
+
+@pytest.mark.django_db
+def test_bulk_notifications_publish_once_per_batch(monkeypatch, django_capture_on_commit_callbacks):
+    recipients = [
+        User.objects.create_user(username=f"bulkpub{i}", password="S3curePassw0rd!")
+        for i in range(3)
+    ]
+    batches = []
+
+    class RecordingBroker(broker.LocalBroker):
+        def publish(self, channel, message):
+            batches.append([(channel, message)])
+
+        def publish_many(self, messages):
+            batches.append(list(messages))
+
+    monkeypatch.setattr(broker, "get_broker", RecordingBroker)
+    with django_capture_on_commit_callbacks(execute=True):
+        created = bulk_create_notifications(
+            [user.id for user in recipients], Notification.Verb.GROUP_APPROVED
+        )
+    assert batches == [[(f"user:{n.recipient_id}", {"id": n.id}) for n in created]]
+
+
+@override_settings(NOTIFICATIONS_OUTBOX=True, REDIS_URL="")
+def test_outbox_without_redis_is_reported_by_checks():
+    assert [warning.id for warning in outbox_needs_redis(None)] == ["notifications.W001"]
+    with override_settings(REDIS_URL="redis://localhost:6379/0"):
+        assert outbox_needs_redis(None) == []
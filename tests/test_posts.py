@@ -1,9 +1,17 @@
+from datetime import timedelta
+from io import StringIO
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from groups.models import Group, Membership
-from posts.models import Comment, Post, Report
+from posts import trending
+from posts.models import Comment, Post, Report, TrendingScore
 from tests.utils import authenticate_client
 
 User = get_user_model()
@@ -28,7 +36,7 @@ def test_create_post_and_comment(api_client):
 
     response = api_client.get(f"/api/v1/posts/{post_id}/comments/")
     assert response.status_code == 200
-    assert response.json()[0]["content"] == "Nice post"
+    assert response.json()["results"][0]["content"] == "Nice post"
 
 
 @pytest.mark.django_db
@@ -142,3 +150,263 @@ def test_posts_cursor_pagination(api_client):
     response = api_client.get("/api/v1/posts/?pagination=cursor")
     assert response.status_code == 200
     assert "results" in response.json()
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_breaks_created_at_ties(api_client):
+    user = User.objects.create_user(username="ties", password="S3curePassw0rd!")
+    posts = [Post.objects.create(author=user, content=f"Tie {i}") for i in range(5)]
+    Post.objects.filter(id__in=[p.id for p in posts]).update(created_at=posts[0].created_at)
+
+    seen = []
+    url = "/api/v1/posts/?page_size=2"
+    pages = []
+    while url:
+        body = api_client.get(url).json()
+        pages.append(body)
+        seen.extend(item["id"] for item in body["results"])
+        url = body["next"]
+
+    assert seen == sorted((p.id for p in posts), reverse=True)
+    assert len(pages) == 3
+
+    previous = api_client.get(pages[-1]["previous"]).json()
+    assert [item["id"] for item in previous["results"]] == seen[2:4]
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_page_size_is_capped_and_validated(api_client):
+    user = User.objects.create_user(username="sizes", password="S3curePassw0rd!")
+    Post.objects.bulk_create(Post(author=user, content=f"Size {i}") for i in range(3))
+
+    for page_size, expected in [("2", 2), ("0", 3), ("-1", 3), ("abc", 3)]:
+        body = api_client.get(f"/api/v1/posts/?page_size={page_size}").json()
+        assert len(body["results"]) == expected
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_rejects_bad_cursor(api_client):
+    response = api_client.get("/api/v1/posts/?cursor=not-a-cursor")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_feed_membership_lookup_is_cached_between_requests(api_client):
+    user = User.objects.create_user(username="cached", password="S3curePassw0rd!")
+    group = Group.objects.create(
+        name="Cached Group",
+        slug="cached-group",
+        created_by=user,
+        visibility=Group.Visibility.PRIVATE,
+    )
+    Membership.objects.create(user=user, group=group, role=Membership.Role.OWNER)
+    post = Post.objects.create(author=user, group=group, content="Members only")
+    authenticate_client(api_client, user)
+
+    response = api_client.get("/api/v1/posts/")
+    assert [item["id"] for item in response.json()["results"]] == [post.id]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/v1/posts/")
+        api_client.get(f"/api/v1/posts/{post.id}/comments/")
+    assert [item["id"] for item in response.json()["results"]] == [post.id]
+    assert not any("groups_membership" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_leaving_group_invalidates_cached_access(api_client, django_capture_on_commit_callbacks):
+    owner = User.objects.create_user(username="owner9", password="S3curePassw0rd!")
+    member = User.objects.create_user(username="member9", password="S3curePassw0rd!")
+    group = Group.objects.create(
+        name="Leavers",
+        slug="leavers",
+        created_by=owner,
+        visibility=Group.Visibility.PRIVATE,
+    )
+    membership = Membership.objects.create(user=member, group=group)
+    post = Post.objects.create(author=owner, group=group, content="Members only")
+    authenticate_client(api_client, member)
+    assert api_client.get(f"/api/v1/posts/{post.id}/comments/").status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        membership.delete()
+        # Until the delete commits, the cached access stays in place.
+        assert api_client.get(f"/api/v1/posts/{post.id}/comments/").status_code == 200
+    assert api_client.get(f"/api/v1/posts/{post.id}/comments/").status_code == 403
+
+
+@pytest.mark.django_db
+def test_group_visibility_change_syncs_post_visibility(api_client):
+    owner = User.objects.create_user(username="owner10", password="S3curePassw0rd!")
+    group = Group.objects.create(name="Flip", slug="flip", created_by=owner)
+    post = Post.objects.create(author=owner, group=group, content="Soon private")
+    assert post.visibility == Group.Visibility.PUBLIC
+    assert api_client.get("/api/v1/posts/").json()["results"][0]["id"] == post.id
+
+    group.visibility = Group.Visibility.PRIVATE
+    group.save()
+
+    post.refresh_from_db()
+    assert post.visibility == Group.Visibility.PRIVATE
+    assert api_client.get("/api/v1/posts/").json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_comment_count_and_repair_command(api_client):
+    user = User.objects.create_user(username="counter", password="S3curePassw0rd!")
+    post = Post.objects.create(author=user, content="Counted")
+    authenticate_client(api_client, user)
+    first = api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "a"}, format="json")
+    api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "b"}, format="json")
+    assert api_client.get(f"/api/v1/posts/{post.id}/").json()["comment_count"] == 2
+
+    api_client.delete(f"/api/v1/comments/{first.json()['id']}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    out = StringIO()
+    call_command("repair_counters", batch_size=1, stdout=out)
+    post.refresh_from_db()
+    assert post.comment_count == 1
+    assert "posts.Post.comment_count: repaired 1 rows" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_comment_threads_nest_first_replies_in_bounded_queries(api_client):
+    user = User.objects.create_user(username="threader", password="S3curePassw0rd!")
+    post = Post.objects.create(author=user, content="Threads")
+    threads = [Comment.objects.create(author=user, post=post, content=f"t{i}") for i in range(3)]
+    first = Comment.objects.create(author=user, post=post, parent=threads[0], content="r1")
+    nested = Comment.objects.create(author=user, post=post, parent=first, content="r1a")
+    second = Comment.objects.create(author=user, post=post, parent=threads[0], content="r2")
+    for i in range(5):
+        Comment.objects.create(author=user, post=post, parent=threads[1], content=f"x{i}")
+    assert nested.root_id == threads[0].id
+    assert nested.depth == 2
+    assert nested.path == f"{threads[0].id:010d}/{first.id:010d}/{nested.id:010d}"
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(f"/api/v1/posts/{post.id}/comments/threads/?replies=2")
+    assert response.status_code == 200
+    assert len(queries) <= 4
+    results = response.json()["results"]
+    assert [item["id"] for item in results] == [thread.id for thread in threads]
+    assert [reply["id"] for reply in results[0]["replies"]] == [first.id]
+    assert [reply["id"] for reply in results[0]["replies"][0]["replies"]] == [nested.id]
+    assert results[0]["has_more_replies"] is True
+    assert len(results[1]["replies"]) == 2
+    assert (results[2]["replies"], results[2]["has_more_replies"]) == ([], False)
+
+    response = api_client.get(f"/api/v1/comments/{threads[0].id}/replies/?page_size=2")
+    body = response.json()
+    assert [item["id"] for item in body["results"]] == [first.id, nested.id]
+    body = api_client.get(body["next"]).json()
+    assert [item["id"] for item in body["results"]] == [second.id]
+    assert body["next"] is None
+
+    response = api_client.get(f"/api/v1/comments/{first.id}/replies/")
+    assert [item["id"] for item in response.json()["results"]] == [nested.id]
+
+
+@pytest.mark.django_db
+def test_anonymous_post_pages_are_cached_until_a_write(api_client):
+    user = User.objects.create_user(username="cacher", password="S3curePassw0rd!")
+    group = Group.objects.create(name="Open", slug="open-cache", created_by=user)
+    Membership.objects.create(user=user, group=group, role=Membership.Role.OWNER)
+    post = Post.objects.create(author=user, group=group, content="First")
+    anonymous = APIClient()
+
+    assert [p["id"] for p in anonymous.get("/api/v1/posts/").json()["results"]] == [post.id]
+    with CaptureQueriesContext(connection) as queries:
+        response = anonymous.get("/api/v1/posts/")
+    assert [p["id"] for p in response.json()["results"]] == [post.id]
+    assert len(queries) == 0
+
+    authenticate_client(api_client, user)
+    created = api_client.post(
+        "/api/v1/posts/", {"content": "Second", "group": group.id}, format="json"
+    ).json()
+    assert [p["id"] for p in anonymous.get("/api/v1/posts/").json()["results"]] == [
+        created["id"],
+        post.id,
+    ]
+    group_url = f"/api/v1/groups/{group.id}/posts/"
+    assert len(anonymous.get(group_url).json()["results"]) == 2
+
+    api_client.post(f"/api/v1/posts/{post.id}/comments/", {"content": "hi"}, format="json")
+    results = anonymous.get(group_url).json()["results"]
+    assert [p["comment_count"] for p in results] == [0, 1]
+
+    api_client.delete(f"/api/v1/posts/{created['id']}/")
+    assert [p["id"] for p in anonymous.get(group_url).json()["results"]] == [post.id]
+    assert [p["id"] for p in anonymous.get("/api/v1/posts/").json()["results"]] == [post.id]
+
+
+@pytest.mark.django_db
+def test_post_and_comments_conditional_get(api_client):
+    user = User.objects.create_user(username="etagger", password="S3curePassw0rd!")
+    post = Post.objects.create(author=user, content="Polled")
+    authenticate_client(api_client, user)
+    comments_url = f"/api/v1/posts/{post.id}/comments/"
+
+    detail = api_client.get(f"/api/v1/posts/{post.id}/")
+    listing = api_client.get(comments_url)
+    assert detail.has_header("Last-Modified")
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(comments_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+    assert response.status_code == 304
+    assert not any("ORDER BY" in query["sql"] for query in queries)
+    response = api_client.get(
+        f"/api/v1/posts/{post.id}/", HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"]
+    )
+    assert response.status_code == 304
+
+    comment = api_client.post(comments_url, {"content": "new"}, format="json").json()
+    response = api_client.get(f"/api/v1/posts/{post.id}/", HTTP_IF_NONE_MATCH=detail["ETag"])
+    assert response.json()["comment_count"] == 1
+    listing = api_client.get(comments_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+    assert listing.status_code == 200
+
+    api_client.delete(f"/api/v1/comments/{comment['id']}/")
+    response = api_client.get(comments_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_trending_ranks_by_decayed_engagement_and_compacts(api_client):
+    user = User.objects.create_user(username="trender", password="S3curePassw0rd!")
+    authenticate_client(api_client, user)
+    older = api_client.post("/api/v1/posts/", {"content": "older"}, format="json").json()
+    newer = api_client.post("/api/v1/posts/", {"content": "newer"}, format="json").json()
+    ranked = [p["id"] for p in api_client.get("/api/v1/posts/trending/").json()["results"]]
+    assert ranked == [newer["id"], older["id"]]
+
+    api_client.post(f"/api/v1/posts/{older['id']}/comments/", {"content": "hot"}, format="json")
+    ranked = [p["id"] for p in api_client.get("/api/v1/posts/trending/").json()["results"]]
+    assert ranked == [older["id"], newer["id"]]
+
+    for name in ("reporter1", "reporter2"):
+        reporter = User.objects.create_user(username=name, password="S3curePassw0rd!")
+        authenticate_client(api_client, reporter)
+        api_client.post(
+            "/api/v1/reports/",
+            {"target_type": "post", "target_id": older["id"], "reason": "spam"},
+            format="json",
+        )
+    ranked = [p["id"] for p in api_client.get("/api/v1/posts/trending/?limit=1").json()["results"]]
+    assert ranked == [newer["id"]]
+
+    stale = Post.objects.create(author=user, content="stale")
+    trending.record_activity(stale.id, 1.0, timezone.now() - timedelta(days=30))
+    trending.record_activity(stale.id, 1.0, timezone.now() - timedelta(days=30))
+    score = TrendingScore.objects.get(post=stale).score
+    assert score == pytest.approx(trending.log_score(2.0, timezone.now() - timedelta(days=30)))
+    out = StringIO()
+    call_command("compact_trending", stdout=out)
+    assert "deleted 1 rows" in out.getvalue()
+    assert set(TrendingScore.objects.values_list("post_id", flat=True)) == {
+        older["id"],
+        newer["id"],
+    }
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from feed.models import TimelineEntry
+from notifications.models import Notification
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+def _age(queryset, days, field="created_at"):
+    queryset.update(**{field: timezone.now() - timedelta(days=days)})
+
+
+def _soft_delete(obj, days):
+    type(obj).objects.filter(pk=obj.pk).update(
+        is_deleted=True, deleted_at=timezone.now() - timedelta(days=days)
+    )
+
+
+@pytest.mark.django_db
+def test_prune_retention_expires_notifications_and_purges_deleted_content():
+    user = User.objects.create_user(username="retainer", password="S3curePassw0rd!")
+    stale_follow = Notification.objects.create(recipient=user, verb=Notification.Verb.FOLLOWED)
+    kept_comment = Notification.objects.create(recipient=user, verb=Notification.Verb.COMMENTED)
+    stale_comment = Notification.objects.create(recipient=user, verb=Notification.Verb.COMMENTED)
+    fresh_follow = Notification.objects.create(recipient=user, verb=Notification.Verb.FOLLOWED)
+    _age(Notification.objects.filter(pk__in=[stale_follow.pk, kept_comment.pk]), 40)
+    _age(Notification.objects.filter(pk=stale_comment.pk), 100)
+
+    post = Post.objects.create(author=user, content="Live")
+    held = Comment.objects.create(author=user, post=post, content="Deleted with a live reply")
+    Comment.objects.create(author=user, post=post, parent=held, content="Live reply")
+    gone = Comment.objects.create(author=user, post=post, content="Deleted branch")
+    gone_reply = Comment.objects.create(author=user, post=post, parent=gone, content="Deleted")
+    recent = Comment.objects.create(author=user, post=post, content="Recently deleted")
+    for comment in (held, gone, gone_reply):
+        _soft_delete(comment, 40)
+    _soft_delete(recent, 5)
+
+    purged_post = Post.objects.create(author=user, content="Old")
+    top = Comment.objects.create(author=user, post=purged_post, content="Top")
+    Comment.objects.create(author=user, post=purged_post, parent=top, content="Reply")
+    TimelineEntry.objects.create(
+        owner=user, post=purged_post, author=user, created_at=purged_post.created_at
+    )
+    _soft_delete(purged_post, 40)
+    recent_post = Post.objects.create(author=user, content="Recent")
+    _soft_delete(recent_post, 5)
+
+    out = StringIO()
+    call_command("prune_retention", "--batch-size", "1", "--sleep", "0", stdout=out)
+
+    assert set(Notification.objects.values_list("pk", flat=True)) == {
+        kept_comment.pk,
+        fresh_follow.pk,
+    }
+    assert not Comment.objects.filter(pk__in=[gone.pk, gone_reply.pk]).exists()
+    assert Comment.objects.filter(pk__in=[held.pk, recent.pk]).count() == 2
+    assert set(Post.objects.values_list("pk", flat=True)) == {post.pk, recent_post.pk}
+    assert not Comment.objects.filter(post_id=purged_post.pk).exists()
+    assert not TimelineEntry.objects.exists()
+    report = out.getvalue()
+    assert "notifications: deleted 2 rows" in report
+    assert "deleted comments: deleted 2 rows" in report
+    assert "deleted posts: deleted 4 rows" in report
@@ -0,0 +1,50 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from groups.models import Group
+from notifications.models import Notification
+from notifications.serializers import NOTIFICATION_VALUES, NotificationSerializer
+from posts.models import Comment, Post
+from posts.serializers import (
+    COMMENT_VALUES,
+    POST_VALUES,
+    CommentSerializer,
+    PostSerializer,
+)
+
+User = get_user_model()
+
+
+def _render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_values_serializers_match_model_serializers_byte_for_byte():
+    author = User.objects.create_user(username="fast", password="S3curePassw0rd!")
+    group = Group.objects.create(name="Fast", slug="fast", created_by=author)
+    post = Post.objects.create(author=author, group=group, content="With group ☃")
+    Post.objects.create(author=author, content="No group")
+    top = Comment.objects.create(author=author, post=post, content="Top")
+    reply = Comment.objects.create(author=author, post=post, parent=top, content="Reply")
+    Notification.objects.create(
+        recipient=author,
+        actor=author,
+        verb=Notification.Verb.REPLIED,
+        target=reply,
+        data={"post_id": post.id, "nested": [1, None]},
+    )
+    Notification.objects.create(recipient=author, verb=Notification.Verb.FOLLOWED)
+
+    cases = [
+        (POST_VALUES, PostSerializer, Post.objects.order_by("id")),
+        (COMMENT_VALUES, CommentSerializer, Comment.objects.order_by("id")),
+        (NOTIFICATION_VALUES, NotificationSerializer, Notification.objects.order_by("id")),
+    ]
+    for tz in ("UTC", "America/New_York"):
+        with timezone.override(tz):
+            for fast, slow, queryset in cases:
+                expected = _render(slow(queryset, many=True).data)
+                assert _render(fast.to_representation(fast.values(queryset))) == expected
@@ -6,7 +6,11 @@ from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.tokens import AccessToken
 
+from users.cache import get_auth_user
+
 User = get_user_model()
+# Stateless between requests, so one instance serves every CSRF check.
+_csrf_check = CsrfViewMiddleware(lambda request: None)
 
 
 class CookieJWTAuthentication(BaseAuthentication):
@@ -25,7 +29,7 @@ class CookieJWTAuthentication(BaseAuthentication):
             raise AuthenticationFailed("Invalid token.")
 
         try:
-            user = User.objects.get(pk=user_id)
+            user = get_auth_user(user_id)
         except User.DoesNotExist as exc:
             raise AuthenticationFailed("User not found.") from exc
 
@@ -39,8 +43,7 @@ class CookieJWTAuthentication(BaseAuthentication):
 
     def _enforce_csrf(self, request):
         request._request._dont_enforce_csrf_checks = False
-        middleware = CsrfViewMiddleware(lambda req: None)
-        reason = middleware.process_view(request._request, None, (), {})
+        reason = _csrf_check.process_view(request._request, None, (), {})
         if reason:
             raise PermissionDenied(f"CSRF Failed: {reason}")
 
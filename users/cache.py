@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from core.cache import bump_version, get_version
+
+AUTH_USER_KEY = "users:auth:{user_id}:{version}"
+AUTH_USER_CACHE_TIMEOUT = 60
+# What authentication and permission checks read; any other field is loaded on first access.
+AUTH_USER_FIELDS = frozenset(
+    {"id", "username", "display_name", "is_active", "is_staff", "is_superuser"}
+)
+
+User = get_user_model()
+
+
+def _version_name(user_id):
+    return f"users:auth:{user_id}"
+
+
+def get_auth_user(user_id):
+    """Return the user behind a validated token, from a versioned cache entry when possible.
+
+    The entry holds only ``AUTH_USER_FIELDS``; the returned instance defers the rest, so code
+    that reads e.g. ``request.user.email`` still gets the current value from the database, one
+    query per field; views that need the whole user (``MeView``) load it in one query instead.
+    The entry is rebuilt from the primary, so a lagging replica cannot re-cache a deactivated
+    user as active. Raises ``User.DoesNotExist`` like ``User.objects.get``.
+    """
+    field_names = [f.attname for f in User._meta.concrete_fields if f.attname in AUTH_USER_FIELDS]
+    key = AUTH_USER_KEY.format(user_id=user_id, version=get_version(_version_name(user_id)))
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.using(DEFAULT_DB_ALIAS).values_list(*field_names).get(pk=user_id)
+        cache.set(key, values, timeout=AUTH_USER_CACHE_TIMEOUT)
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+
+def invalidate_auth_user(*user_ids):
+    """Drop the cached entries now; callers inside a transaction use ``on_commit``."""
+    bump_version(*(_version_name(user_id) for user_id in user_ids))
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from core.counters import count_of, repair_counter
+
+
+def backfill(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Follow = apps.get_model("social", "Follow")
+    repair_counter(User, "follower_count", lambda: count_of(Follow, "following"))
+    repair_counter(User, "following_count", lambda: count_of(Follow, "follower"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_follow_counts"),
+        ("social", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
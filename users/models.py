@@ -3,6 +3,9 @@ from django.db import models
 
 class User(AbstractUser):
     display_name = models.CharField(max_length=120, blank=True)
+    # Denormalized Follow counts, maintained with F() updates in social.views.
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     def __str__(self) -> str:
         return self.username
@@ -41,5 +41,5 @@ class RegisterSerializer(serializers.ModelSerializer):
 class UserMeSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ("id", "username", "email", "display_name")
-        read_only_fields = ("id", "username")
+        fields = ("id", "username", "email", "display_name", "follower_count", "following_count")
+        read_only_fields = ("id", "username", "follower_count", "following_count")
@@ -0,0 +1,16 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.cache import invalidate_auth_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Covers profile edits, deactivation and password changes (set_password + save). Bumping
+    # before commit would let a concurrent request re-cache the old row under the new version.
+    transaction.on_commit(lambda: invalidate_auth_user(instance.pk))
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.middleware.csrf import get_token
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie
@@ -10,6 +11,8 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from users.serializers import RegisterSerializer, UserMeSerializer
 from users.throttles import LoginThrottle, RegisterThrottle, UserWriteThrottle
 
+User = get_user_model()
+
 
 def _set_auth_cookies(resp, access, refresh=None):
     resp.set_cookie(
@@ -148,4 +151,5 @@ class MeView(generics.RetrieveUpdateAPIView):
     throttle_classes = [UserWriteThrottle]
 
     def get_object(self):
-        return self.request.user
+        # request.user is the cached auth user with most fields deferred; load it whole.
+        return User.objects.get(pk=self.request.user.pk)